@@ -0,0 +1,65 @@
+"""
+Author:
+Nilusink
+
+floor checks against a growing number of platforms, linear scan vs grid
+(one point at a time and batched)
+
+run from the repository root:
+python -m benchmarks.platform_benchmark
+"""
+from core.spatial import PlatformGrid, segment_entry
+import numpy as np
+import timeit
+
+
+def random_world(count: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    count platforms of 100 - 400 x 20 px in a 1920 x 1080 world
+    """
+    position = rng.uniform((0, 0), (1920, 1080), (count, 2))
+    size = np.column_stack([rng.uniform(100, 400, count), np.full(count, 20)])
+    return np.hstack([position, position + size])
+
+
+def linear_floor_at(rects: list[tuple[float, float, float, float]], x: float, y: float) -> float | None:
+    for x0, y0, x1, y1 in rects:
+        if x0 < x < x1 and y0 < y < y1:
+            return y0
+
+    return None
+
+
+def main(points: int = 500) -> None:
+    rng = np.random.default_rng(0)
+    print(
+        f"{'platforms':<12}{'linear / point':>16}{'grid / point':>16}{'batch / point':>16}"
+        f"{'segments (all)':>16}{'segments (grid)':>16}"
+    )
+    for count in (10, 100, 500, 2000):
+        rects = random_world(count, rng)
+        grid = PlatformGrid(rects)
+        as_tuples = [tuple(rect) for rect in rects.tolist()]
+
+        xy = rng.uniform((0, 0), (1920, 1080), (points, 2))
+        end = xy + rng.uniform(-30, 30, (points, 2))
+        scalar = xy.tolist()
+
+        linear = min(timeit.repeat(lambda: [linear_floor_at(as_tuples, x, y) for x, y in scalar], number=5, repeat=3))
+        indexed = min(timeit.repeat(lambda: [grid.floor_at(x, y) for x, y in scalar], number=5, repeat=3))
+        batched = min(timeit.repeat(lambda: grid.floors_at(xy), number=5, repeat=3))
+        swept_all = min(timeit.repeat(lambda: segment_entry(xy, end, rects), number=5, repeat=3))
+        swept_grid = min(timeit.repeat(lambda: grid.segment_entry(xy, end), number=5, repeat=3))
+
+        print(
+            f"{count:<12}"
+            f"{linear / 5 / points * 1e6:>14.2f}us"
+            f"{indexed / 5 / points * 1e6:>14.2f}us"
+            f"{batched / 5 / points * 1e6:>14.2f}us"
+            f"{swept_all / 5 * 1e3:>14.2f}ms"
+            f"{swept_grid / 5 * 1e3:>14.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
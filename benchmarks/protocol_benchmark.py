@@ -0,0 +1,240 @@
+"""
+Author:
+Nilusink
+
+serialization and parsing throughput of the wire protocol versions
+and the bandwidth of full vs. delta player updates
+
+run from the repository root:
+python -m benchmarks.protocol_benchmark
+"""
+from core.protocol import PROTOCOL_VERSION, LEGACY_VERSION, FRAME_HEADER, encode, decode
+from core.snapshots import SnapshotEncoder, SnapshotDecoder
+from core.gamesocket import GameSocket
+from threading import Thread
+import socket
+import timeit
+import json
+import time
+
+
+PACKET: dict = {
+    "name": "4815162",
+    "hp": 7.5,
+    "pos": {"x": 812.25, "y": 949.99},
+    "vel": {"x": 50.0, "y": -12.5},
+    "events": [
+        {"type": 0, "weapon": "AK47", "angle": 1.234, "pos": {"x": 830.0, "y": 930.0}, "id": 123456789},
+        {"type": 0, "weapon": "Sniper", "angle": -0.5, "pos": {"x": 790.0, "y": 931.0}, "id": 987654321},
+    ]
+}
+
+
+class BufferSocket(GameSocket):
+    """
+    reads from a prepared buffer instead of the network
+    """
+    data: bytes = b""
+    position: int = 0
+    input_buffer: bytes = b""
+
+    def recv(self, size: int, *_args) -> bytes:
+        chunk = self.data[self.position:self.position + size]
+        self.position += len(chunk)
+        return chunk
+
+    def recv_into(self, buffer, size: int = 0, *_args) -> int:
+        size = min(size or len(buffer), len(self.data) - self.position)
+        buffer[:size] = self.data[self.position:self.position + size]
+        self.position += size
+        return size
+
+    def load(self, data: bytes) -> None:
+        self.data, self.position, self.input_buffer = data, 0, b""
+        self.reset_input()
+
+
+def old_send_packet(packet: dict) -> bytes:
+    """
+    the encoding of the old GameSocket.send_packet (without sending)
+    """
+    spacket = f"\x01{json.dumps(packet)}\x04"
+    return spacket.encode("ASCII")
+
+
+def old_recv_packet(sock: BufferSocket) -> dict:
+    """
+    the old GameSocket.recv_packet, byte by byte
+    """
+    store_bytes: bool = False
+    msg_body: str = ""
+    msg: bytes = b""
+    while True:
+        current_buffer = sock.input_buffer + msg
+        for index, byte in enumerate(current_buffer):
+            match byte:
+                case 0x01:
+                    store_bytes = True
+
+                case 0x04:
+                    if index == 0:
+                        continue
+
+                    sock.input_buffer = current_buffer[index:]
+                    return json.loads(msg_body)
+
+                case _:
+                    if store_bytes:
+                        msg_body += current_buffer[index:index+1].decode("ASCII")
+
+        msg: bytes = sock.recv(1024)
+        if msg == b"":
+            raise ValueError
+
+
+def concat_recv_frame(sock: GameSocket) -> dict:
+    """
+    version 2 framing on top of bytes concatenation (before recv_into)
+    """
+    while True:
+        if len(sock.input_buffer) >= FRAME_HEADER.size:
+            length, kind = FRAME_HEADER.unpack_from(sock.input_buffer)
+            end = FRAME_HEADER.size + length
+            if len(sock.input_buffer) >= end:
+                payload = sock.input_buffer[FRAME_HEADER.size:end]
+                sock.input_buffer = sock.input_buffer[end:]
+                return decode(kind, payload)
+
+        msg = sock.recv(65536)
+        if msg == b"":
+            raise ValueError
+
+        sock.input_buffer += msg
+
+
+def stream(packets: int) -> None:
+    """
+    many frames over a local socket, sent in chunks of different size
+    """
+    data = encode(PACKET) * packets
+
+    print(f"\n{packets} frames over a socketpair, us / frame")
+    print(f"{'send size':<12}{'concat':>10}{'recv_into':>12}")
+    for chunk_size in (64, 1024, 65536):
+        def send(sock: socket.socket) -> None:
+            for start in range(0, len(data), chunk_size):
+                sock.sendall(data[start:start + chunk_size])
+
+        def concat() -> float:
+            sender, receiver = socket.socketpair()
+            receiver = GameSocket.from_socket(receiver)
+            receiver.input_buffer = b""
+            thread = Thread(target=send, args=(sender,))
+
+            start = time.perf_counter()
+            thread.start()
+            for _ in range(packets):
+                concat_recv_frame(receiver)
+
+            took = time.perf_counter() - start
+            thread.join()
+            sender.close(), receiver.close()
+            return took
+
+        def into() -> float:
+            sender, receiver = socket.socketpair()
+            receiver = GameSocket.from_socket(receiver)
+            receiver.protocol_version = PROTOCOL_VERSION
+            thread = Thread(target=send, args=(sender,))
+
+            start = time.perf_counter()
+            thread.start()
+            for _ in range(packets):
+                receiver.recv_packet()
+
+            took = time.perf_counter() - start
+            thread.join()
+            sender.close(), receiver.close()
+            return took
+
+        took_concat = min(concat() for _ in range(3))
+        took_into = min(into() for _ in range(3))
+        print(f"{chunk_size:<12}{took_concat / packets * 1e6:>10.2f}{took_into / packets * 1e6:>12.2f}")
+
+
+def bandwidth(tick_rate: int = 60, seconds: int = 10) -> None:
+    """
+    bytes per second for one player, sent every tick
+    """
+    def state(t: float, speed: float) -> dict:
+        # walks back and forth, with some float noise on top
+        x = 500 + speed * (t % 4 if t % 8 < 4 else 8 - t % 8)
+        return {
+            "name": "4815162",
+            "hp": 10.,
+            "pos": {"x": x + 1e-3 * (t * 7919 % 1), "y": 700.01},
+            "vel": {"x": speed if t % 8 < 4 else -speed, "y": 0.},
+            "events": []
+        }
+
+    print(f"\nbytes / s per player at {tick_rate} ticks / s")
+    print(f"{'scene':<14}{'v2 full':>10}{'v3 delta':>10}")
+    for scene, speed in (("idle", 0), ("slow (5px/s)", 5), ("walking", 50)):
+        encoder, decoder = SnapshotEncoder(), SnapshotDecoder()
+        full_size = delta_size = 0
+
+        for tick in range(tick_rate * seconds):
+            packet = state(tick / tick_rate, speed)
+            full_size += len(encode(packet, 2))
+
+            delta = encoder.encode(packet)
+            if delta is not None:
+                delta_size += len(encode(delta))
+                decoder.decode(delta)
+
+        print(f"{scene:<14}{full_size / seconds:>10.0f}{delta_size / seconds:>10.0f}")
+
+
+def main(packets: int = 2000) -> None:
+    sock = BufferSocket()
+
+    encoders = {
+        "old json": lambda: old_send_packet(PACKET),
+        "v1 json": lambda: encode(PACKET, LEGACY_VERSION),
+        "v2 binary": lambda: encode(PACKET, 2),
+        "v3 delta": lambda: encode(PACKET, PROTOCOL_VERSION),
+    }
+
+    print(f"{'':<12}{'bytes':>8}{'encode us':>12}{'decode us':>12}")
+    for name, encoder in encoders.items():
+        took_encode = min(timeit.repeat(encoder, number=packets, repeat=3))
+
+        # one packet per recv, the old parser breaks on packets split between two
+        encoded = encoder()
+        if name == "old json":
+            def parse():
+                sock.load(encoded)
+                old_recv_packet(sock)
+
+        else:
+            sock.protocol_version = LEGACY_VERSION if name == "v1 json" else PROTOCOL_VERSION
+
+            def parse():
+                sock.load(encoded)
+                sock.recv_packet()
+
+        took_decode = min(timeit.repeat(parse, number=packets, repeat=3))
+        print(
+            f"{name:<12}"
+            f"{len(encoded):>8}"
+            f"{took_encode / packets * 1e6:>12.2f}"
+            f"{took_decode / packets * 1e6:>12.2f}"
+        )
+
+    sock.close()
+    stream(packets * 10)
+    bandwidth()
+
+
+if __name__ == "__main__":
+    main()
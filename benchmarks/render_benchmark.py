@@ -0,0 +1,51 @@
+"""
+Author:
+Nilusink
+
+compares the frame time of full redraws and dirty rect rendering
+
+run from the repository root:
+python -m benchmarks.render_benchmark
+"""
+import os
+
+# no window needed for timing the compositor
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from core.game import *
+
+
+def run(frames: int) -> float:
+    """
+    :returns: average frame time in ms
+    """
+    took = 0
+    for _ in range(frames):
+        start = time.perf_counter()
+        Game.update()
+        Game.update_display()
+        took += time.perf_counter() - start
+        time.sleep(.002)
+
+    return took / frames * 1000
+
+
+def main(frames: int = 200) -> None:
+    for x in range(200, 1800, 200):
+        Player(spawn_point=Vec2.from_cartesian(x=x, y=910), name=str(x))
+
+    Turret(position=Vec2.from_cartesian(x=1000, y=700), weapon=AK47)
+    Turret(position=Vec2.from_cartesian(x=600, y=600), weapon=Sniper)
+
+    # warm up (caches, first shots)
+    run(20)
+
+    for dirty in (False, True):
+        Game.dirty_rendering = dirty
+        print(f"{'dirty rects' if dirty else 'full redraw':<12} {run(frames):7.2f} ms / frame")
+
+    os._exit(0)
+
+
+if __name__ == "__main__":
+    main()
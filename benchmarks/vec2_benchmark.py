@@ -0,0 +1,145 @@
+"""
+Author:
+Nilusink
+
+microbenchmark for the most common Vec2 operations, the old NumPy based
+Vec2 vs the current one
+
+run from the repository root:
+python -m benchmarks.vec2_benchmark
+"""
+from core.new_types import Vec2
+import numpy as np
+import timeit
+
+
+class OldVec2:
+    """
+    the old Vec2 (only what the cases use), it kept the polar form in sync
+    with NumPy on every change and had no in-place operators
+    """
+    def __init__(self) -> None:
+        self.__x: float = 0
+        self.__y: float = 0
+        self.__angle: float = 0
+        self.__length: float = 0
+
+    @property
+    def x(self):
+        return self.__x
+
+    @x.setter
+    def x(self, value):
+        self.__x = value
+        self.__update("c")
+
+    @property
+    def y(self):
+        return self.__y
+
+    @y.setter
+    def y(self, value):
+        self.__y = value
+        self.__update("c")
+
+    @property
+    def xy(self):
+        return self.__x, self.__y
+
+    @xy.setter
+    def xy(self, xy):
+        self.__x = xy[0]
+        self.__y = xy[1]
+        self.__update("c")
+
+    @property
+    def angle(self):
+        return self.__angle
+
+    @property
+    def length(self):
+        return self.__length
+
+    @length.setter
+    def length(self, value):
+        self.__length = value
+        self.__update("p")
+
+    @property
+    def polar(self):
+        return self.__angle, self.__length
+
+    @polar.setter
+    def polar(self, polar):
+        self.__angle = polar[0]
+        self.__length = polar[1]
+        self.__update("p")
+
+    def copy(self):
+        return OldVec2().from_cartesian(x=self.x, y=self.y)
+
+    def __add__(self, other):
+        if issubclass(type(other), OldVec2):
+            return OldVec2.from_cartesian(x=self.x + other.x, y=self.y + other.y)
+
+        return OldVec2.from_cartesian(x=self.x + other, y=self.y + other)
+
+    def __mul__(self, other):
+        if issubclass(type(other), OldVec2):
+            return OldVec2.from_polar(angle=self.angle + other.angle, length=self.length * other.length)
+
+        return OldVec2.from_cartesian(x=self.x * other, y=self.y * other)
+
+    def __update(self, calc_from):
+        if calc_from in ("p", "polar"):
+            self.__x = np.cos(self.angle) * self.length
+            self.__y = np.sin(self.angle) * self.length
+
+        elif calc_from in ("c", "cartesian"):
+            self.__length = np.sqrt(self.x**2 + self.y**2)
+            self.__angle = np.arctan2(self.y, self.x)
+
+    @staticmethod
+    def from_cartesian(x, y) -> "OldVec2":
+        p = OldVec2()
+        p.xy = x, y
+
+        return p
+
+    @staticmethod
+    def from_polar(angle, length) -> "OldVec2":
+        p = OldVec2()
+        p.polar = angle, length
+
+        return p
+
+
+CASES: dict[str, str] = {
+    "from_cartesian": "Vec2.from_cartesian(3.0, 4.0)",
+    "from_polar": "Vec2.from_polar(angle=1.0, length=5.0)",
+    "copy": "a.copy()",
+    "a + b": "a + b",
+    "a * 2": "a * 2.0",
+    "a += b": "c += b",
+    "a *= 2": "c *= 1.0",
+    "x setter": "c.x = 3.0",
+    "angle getter": "a.angle",
+    "length setter": "c.length = 5.0",
+    "position update": "p = a + b * 0.016",
+}
+
+
+def main(number: int = 200_000) -> None:
+    setup = "a = Vec2.from_cartesian(3.0, 4.0); b = Vec2.from_cartesian(1.0, -2.0); c = a.copy()"
+    print(f"{'operation':<20}{'old ns / op':>14}{'new ns / op':>14}{'speed-up':>10}")
+    for name, statement in CASES.items():
+        # the old Vec2 has no in-place operators, += and *= allocate a new one there
+        took = [
+            min(timeit.repeat(statement, setup, number=number, repeat=3, globals={"Vec2": implementation}))
+            for implementation in (OldVec2, Vec2)
+        ]
+        print(f"{name:<20}{took[0] / number * 1e9:>14.1f}{took[1] / number * 1e9:>14.1f}{took[0] / took[1]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
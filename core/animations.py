@@ -2,31 +2,61 @@
 Author:
 Nilusink
 """
-from core.basegame import Game
-from threading import Thread
+from core.basegame import Animations
+from core.new_types import Vec2
+from core.assets import Assets
+import core.config as config
 import pygame as pg
-import time
-import os
+
+
+class Animation(pg.sprite.Sprite):
+    """
+    plays a sequence of images once, advanced by the game loop
+    """
+    frames: list[pg.Surface]
+    surface: pg.Surface
+    image: pg.Surface
+    rect: pg.Rect
+    delay: float
+    __elapsed: float
+
+    def __init__(self, frames: list[pg.Surface], position: Vec2, surface: pg.Surface, delay: float = .2) -> None:
+        """
+        :param frames: the images to play
+        :param position: top left corner
+        :param surface: where to draw the animation
+        :param delay: time each frame is shown (in seconds)
+        """
+        super().__init__()
+        self.frames = frames
+        self.surface = surface
+        self.delay = delay
+        self.__elapsed = 0
+
+        self.image = frames[0]
+        self.rect = self.image.get_rect(topleft=position.xy)
+
+        self.add(Animations)
+
+    def update(self, delta: float) -> None:
+        # animations run in real time
+        self.__elapsed += delta / config.const.T_MULT
+
+        index = int(self.__elapsed / self.delay)
+        if index >= len(self.frames):
+            self.kill()
+            return
+
+        self.image = self.frames[index]
 
 
 def play_animation(directory, position, size, surface, delay=.2):
     """
     play an animation from a directory
     """
-    if not os.path.exists(directory):
-        raise FileNotFoundError(f"No such file or directory: {directory}")
+    frames = Assets.directory(directory, (size.x, size.y))
 
     position.x -= size.x / 2
     position.y -= size.y / 2
 
-    def inner():
-        images = [file for file in os.listdir(directory) if file.endswith(".png")]
-        images.sort()
-        for image in images:
-            img = pg.image.load(directory+"/"+image)
-            img = pg.transform.scale(img, (size.x, size.y))
-            x = Game.blit(surface, img, position)
-            time.sleep(delay)
-            Game.unblit(x)
-
-    Thread(target=inner).start()
+    return Animation(frames, position, surface, delay)
@@ -6,4 +6,15 @@ from core.new_types import Vec2
 import pygame as pg
 
 
-def play_animation(directory: str, position: Vec2, size: Vec2, surface: pg.Surface, delay: float = .2) -> None: ...
+class Animation(pg.sprite.Sprite):
+    frames: list[pg.Surface]
+    surface: pg.Surface
+    image: pg.Surface
+    rect: pg.Rect
+    delay: float
+    __elapsed: float
+    def __init__(self, frames: list[pg.Surface], position: Vec2, surface: pg.Surface, delay: float = .2) -> None: ...
+    def update(self, delta: float) -> None: ...
+
+
+def play_animation(directory: str, position: Vec2, size: Vec2, surface: pg.Surface, delay: float = .2) -> Animation: ...
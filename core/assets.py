@@ -0,0 +1,106 @@
+"""
+Author:
+Nilusink
+
+loads every image only once
+"""
+import pygame as pg
+import typing as tp
+import os
+
+
+class AssetManager:
+    """
+    cache for images (and scaled variants of them)
+
+    everything should be loaded by the preload hooks, so no image has
+    to be read from disk while playing
+    """
+    __images: dict[str, pg.Surface]
+    __scaled: dict[tuple[str, tuple[int, int]], pg.Surface]
+    __directories: dict[tuple[str, tuple[int, int] | None], list[pg.Surface]]
+    __preload_hooks: list[tp.Callable[[], tp.Any]]
+    __preloaded: bool
+
+    def __init__(self) -> None:
+        self.__images = {}
+        self.__scaled = {}
+        self.__directories = {}
+        self.__preload_hooks = []
+        self.__preloaded = False
+
+    @property
+    def preloaded(self) -> bool:
+        return self.__preloaded
+
+    def image(self, path: str, size: tuple[int, int] | None = None) -> pg.Surface:
+        """
+        get an image, loaded from disk only the first time
+
+        :param path: path to the image
+        :param size: scale the image to (width, height)
+        """
+        path = os.path.normpath(path)
+        if path not in self.__images:
+            image = pg.image.load(path)
+
+            # converting needs a window
+            if pg.display.get_surface() is not None:
+                image = image.convert_alpha()
+
+            self.__images[path] = image
+
+        if size is None:
+            return self.__images[path]
+
+        size = (int(size[0]), int(size[1]))
+        if (path, size) not in self.__scaled:
+            self.__scaled[path, size] = pg.transform.scale(self.__images[path], size)
+
+        return self.__scaled[path, size]
+
+    def directory(self, path: str, size: tuple[int, int] | None = None) -> list[pg.Surface]:
+        """
+        all png images of a directory, sorted by filename
+        """
+        path = os.path.normpath(path)
+        if size is not None:
+            size = (int(size[0]), int(size[1]))
+
+        if (path, size) not in self.__directories:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"No such file or directory: {path}")
+
+            files = sorted(file for file in os.listdir(path) if file.endswith(".png"))
+            self.__directories[path, size] = [self.image(os.path.join(path, file), size) for file in files]
+
+        return self.__directories[path, size]
+
+    def add_preload_hook(self, hook: tp.Callable[[], tp.Any]) -> None:
+        """
+        register a function that loads assets
+
+        if the assets have already been preloaded, the hook is called immediately
+        """
+        self.__preload_hooks.append(hook)
+        if self.__preloaded:
+            hook()
+
+    def preload(self, directory: str | None = None) -> None:
+        """
+        load every png in directory and run all preload hooks
+        """
+        if directory is not None:
+            for root, _dirs, files in os.walk(directory):
+                for file in files:
+                    if file.endswith(".png"):
+                        self.image(os.path.join(root, file))
+
+        for hook in self.__preload_hooks:
+            hook()
+
+        self.__preloaded = True
+
+
+# should be the only instance of the class
+Assets = AssetManager()
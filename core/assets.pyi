@@ -0,0 +1,24 @@
+"""
+Author:
+Nilusink
+"""
+import pygame as pg
+import typing as tp
+
+
+class AssetManager:
+    __images: dict[str, pg.Surface]
+    __scaled: dict[tuple[str, tuple[int, int]], pg.Surface]
+    __directories: dict[tuple[str, tuple[int, int] | None], list[pg.Surface]]
+    __preload_hooks: list[tp.Callable[[], tp.Any]]
+    __preloaded: bool
+    def __init__(self) -> None: ...
+    @property
+    def preloaded(self) -> bool: ...
+    def image(self, path: str, size: tuple[int, int] | None = None) -> pg.Surface: ...
+    def directory(self, path: str, size: tuple[int, int] | None = None) -> list[pg.Surface]: ...
+    def add_preload_hook(self, hook: tp.Callable[[], tp.Any]) -> None: ...
+    def preload(self, directory: str | None = None) -> None: ...
+
+
+Assets: AssetManager
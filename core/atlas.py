@@ -0,0 +1,61 @@
+"""
+Author:
+Nilusink
+
+pre-rotated images
+"""
+import pygame as pg
+
+
+class RotationAtlas:
+    """
+    every rotation of an image, rendered once at a fixed angular resolution
+
+    the collision masks are made together with the frames and kept here,
+    all atlases together hold more of them than the shared `Masks` cache
+    """
+    __frames: list[pg.Surface]
+    __masks: list[pg.mask.Mask]
+    __image: pg.Surface
+    __step: float
+
+    def __init__(self, image: pg.Surface, step: float = 2) -> None:
+        """
+        :param image: the unrotated image
+        :param step: angular resolution in degrees
+        """
+        self.__image = image
+        self.__step = step
+
+        self.__frames = [pg.transform.rotate(image, i * step) for i in range(round(360 / step))]
+        self.__masks = [pg.mask.from_surface(frame) for frame in self.__frames]
+
+    @property
+    def image(self) -> pg.Surface:
+        return self.__image
+
+    @property
+    def step(self) -> float:
+        return self.__step
+
+    def __len__(self) -> int:
+        return len(self.__frames)
+
+    def index(self, angle: float) -> int:
+        """
+        index of the frame nearest to angle (in degrees)
+        """
+        return round(angle / self.__step) % len(self.__frames)
+
+    def frame(self, index: int) -> pg.Surface:
+        return self.__frames[index]
+
+    def mask(self, index: int) -> pg.mask.Mask:
+        return self.__masks[index]
+
+    def place(self, index: int, rect: pg.Rect, x: float, y: float) -> None:
+        """
+        resize rect to the frame and center it on (x, y)
+        """
+        rect.size = self.__frames[index].get_size()
+        rect.center = x, y
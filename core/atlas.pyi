@@ -0,0 +1,22 @@
+"""
+Author:
+Nilusink
+"""
+import pygame as pg
+
+
+class RotationAtlas:
+    __frames: list[pg.Surface]
+    __masks: list[pg.mask.Mask]
+    __image: pg.Surface
+    __step: float
+    def __init__(self, image: pg.Surface, step: float = 2) -> None: ...
+    @property
+    def image(self) -> pg.Surface: ...
+    @property
+    def step(self) -> float: ...
+    def __len__(self) -> int: ...
+    def index(self, angle: float) -> int: ...
+    def frame(self, index: int) -> pg.Surface: ...
+    def mask(self, index: int) -> pg.mask.Mask: ...
+    def place(self, index: int, rect: pg.Rect, x: float, y: float) -> None: ...
@@ -2,10 +2,19 @@
 Author:
 Nilusink
 """
+from core.physics import Projectiles, GRAVITY, FRICTION, BOUNCE
+from core.spatial import SpatialHash, PlatformGrid
+from core.terrain import Terrain
+from core.registry import Entities
+from core.assets import Assets
+from core.clock import FixedTimestep, FrameLimiter
+from core.inputs import Inputs
+from core.text import Texts
 from contextlib import suppress
 from core.new_types import Vec2
 import core.config as config
 import pygame as pg
+import numpy as np
 import typing as tp
 import string
 import json
@@ -13,8 +22,18 @@ import time
 import os
 
 
+# simulate without a window, fonts or drawing (e.g. on the server)
+# has to be set before the first import of core.basegame
+HEADLESS: bool = os.environ.get("GAME_HEADLESS", "0") not in ("", "0")
+
+
 class _Game:
-    def __init__(self, world_path: str, window_size: tuple[int, int] = ...):
+    def __init__(self, world_path: str, window_size: tuple[int, int] = ..., headless: bool = False):
+        self.headless = headless
+        if headless:
+            # pygame still needs a video driver for images and masks
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
         # initialize pygame
         pg.init()
         pg.font.init()
@@ -23,39 +42,81 @@ class _Game:
             screen_info = pg.display.Info()
             window_size = (screen_info.current_w, screen_info.current_h)
 
-        # create window
-        self.screen = pg.display.set_mode(window_size, pg.SCALED)
-        self.lowest_layer = pg.Surface(window_size, pg.SRCALPHA, 32)
-        self.middle_layer = pg.Surface(window_size, pg.SRCALPHA, 32)
-        self.top_layer = pg.Surface(window_size, pg.SRCALPHA, 32)
-        self.font = pg.font.SysFont(None, 24)
-        pg.display.set_caption("GayGame")
-        pg.mouse.set_visible(False)
+        self.__world_size = tuple(window_size)
+
+        if headless:
+            # only there so images can be converted, nothing is ever drawn
+            self.screen = pg.display.set_mode((1, 1))
+            self.lowest_layer = pg.Surface((1, 1)).convert()
+            self.middle_layer = pg.Surface((1, 1), pg.SRCALPHA, 32)
+            self.top_layer = pg.Surface((1, 1), pg.SRCALPHA, 32)
+            self.font = None
+
+        else:
+            # create window
+            self.screen = pg.display.set_mode(window_size, pg.SCALED)
+            # the world is static, so this layer is only redrawn when the world changes
+            self.lowest_layer = pg.Surface(window_size).convert()
+            self.middle_layer = pg.Surface(window_size, pg.SRCALPHA, 32)
+            self.top_layer = pg.Surface(window_size, pg.SRCALPHA, 32)
+            self.font = pg.font.SysFont(None, 24)
+            pg.display.set_caption("GayGame")
+            pg.mouse.set_visible(False)
+
+        # load all images now, so the game doesn't have to read them while running
+        Assets.preload("./images")
 
         # later used variables
         self.__registered_objects: list[pg.sprite.Sprite] = []
 
-        self.__pressed_keys: dict[str, bool] = {}
-        self.__last_pressed_keys: dict[str, bool] = {}
+        # register the default keys, so they are tracked from the first frame on
+        for key in [*string.ascii_lowercase, *string.digits, "SPACE", "LEFT", "RIGHT", "UP", "scroll_up", "scroll_down"]:
+            Inputs.action(key)
 
         self.__last = time.time()
+        self.__timestep = FixedTimestep(config.const.TICK_RATE, config.const.MAX_FRAME_TIME)
+        self.__limiter = FrameLimiter(config.const.FPS_CAP)
 
         self.__platforms: list[dict] = []
+        self.__platform_grid: PlatformGrid = PlatformGrid(np.zeros((0, 4)))
+        self.__terrain: Terrain | None = None
         self.__world_config: dict = {}
+        self.__world_changed: bool = True
         self.__to_blit: list[tuple[pg.Surface, pg.Surface, Vec2]] = []
 
         self.__text_to_rend: list[tuple[str, Vec2, pg.Surface, tuple[float, float, float, float]]] = []
 
+        # dirty rect rendering, only redraws the changed parts of the screen
+        self.dirty_rendering: bool = config.const.DIRTY_RECTS
+        self.max_dirty_rects: int = config.const.MAX_DIRTY_RECTS
+        self.__dirty: list[pg.Rect] = []
+        self.__last_dirty: list[pg.Rect] | None = None
+        self.__update_rects: list[pg.Rect] | None = None
+
+        # pixel terrain that can be destroyed by explosions
+        self.destructible_terrain: bool = config.const.DESTRUCTIBLE_TERRAIN
+
         self.load_world(world_path)
 
     def print(self, text: str, position: Vec2, surface: pg.Surface, color: tuple[float, float, float, float]) -> None:
+        if self.headless:
+            return
+
         self.__text_to_rend.append((text, position, surface, color))
 
     def _render_text(self) -> None:
-        for element in self.__text_to_rend.copy():
-            self.__text_to_rend.remove(element)
-            surf = self.font.render(element[0], False, element[3])
-            element[2].blit(surf, element[1].xy)
+        to_render, self.__text_to_rend = self.__text_to_rend, []
+        for text, position, surface, color in to_render:
+            self.mark_dirty(Texts.blit(surface, self.font, text, color, position.xy))
+
+    def mark_dirty(self, rect: pg.Rect) -> pg.Rect:
+        """
+        mark a region of any layer as drawn on this frame
+        """
+        if self.dirty_rendering:
+            self.__dirty.append(rect.inflate(2, 2))
+
+        return rect
 
     def load_world(self, world_path: str) -> None:
         if not os.path.exists(world_path):
@@ -64,120 +125,296 @@ class _Game:
         config: dict = json.load(open(world_path, "r"))
         self.__platforms = config["platforms"]
         config.pop("platforms")
+
+        # x0, y0, x1, y1 per platform, indexed for the floor checks
+        self.__platform_grid = PlatformGrid(np.array([
+            [*platform["pos"], platform["pos"][0] + platform["size"][0], platform["pos"][1] + platform["size"][1]]
+            for platform in self.__platforms
+        ], dtype=np.float64))
+
+        self.__terrain = None
+        if self.destructible_terrain:
+            self.__terrain = Terrain(self.__world_size, self.__platform_grid.rects)
+
         self.__world_config = config
+        self.__world_changed = True
+
+    @property
+    def platform_grid(self) -> PlatformGrid:
+        return self.__platform_grid
+
+    @property
+    def terrain(self) -> Terrain | None:
+        """
+        the pixel terrain, None if destructible terrain is disabled
+        """
+        return self.__terrain
+
+    @property
+    def __solids(self) -> PlatformGrid | Terrain:
+        """
+        what sprites collide with, either the platforms or the terrain
+        """
+        return self.__platform_grid if self.__terrain is None else self.__terrain
+
+    def draw_world(self) -> bool:
+        """
+        render the world to lowest_layer (only if it changed since the last call)
+
+        :returns: if the world was redrawn
+        """
+        if not self.__world_changed:
+            return False
 
-    def draw_world(self) -> None:
         self.lowest_layer.fill(self.__world_config["background"])
         for platform in self.__platforms:
             pg.draw.rect(self.lowest_layer, platform["color"], pg.Rect(*platform["pos"], *platform["size"]))
 
-    def on_floor(self, point: Vec2):
+        self.__world_changed = False
+        return True
+
+    def on_floor(self, point: Vec2) -> bool:
         """
         takes a point and checks if it is on the floor
         """
-        for platform in self.__platforms:
-            pos = platform["pos"]
-            size = platform["size"]
-            if all([
-                pos[0] < point.x < pos[0] + size[0],
-                pos[1] < point.y < pos[1] + size[1]
-            ]):
-                return True
-        return False
+        if self.__terrain is not None:
+            return self.__terrain.is_solid(point.x, point.y)
+
+        return self.floor_at(point) is not None
+
+    def floor_at(self, point: Vec2) -> float | None:
+        """
+        the top edge of the platform the point is in
 
-    def is_pressed(self, key: str) -> bool:
-        return key in self.__pressed_keys and self.__pressed_keys[key]
+        :returns: the y coordinate of the top edge, None if the point isn't in a platform
+        """
+        return self.__solids.floor_at(point.x, point.y)
+
+    def sweep_floor(self, start: Vec2, end: Vec2) -> float | None:
+        """
+        the first platform top edge crossed when moving from start to end
+
+        only catches downward movement, a point that starts inside a
+        platform is handled by `floor_at`
+
+        :returns: the y coordinate of the top edge, None if nothing was crossed
+        """
+        dy = end.y - start.y
+        if dy <= 0:
+            return None
 
-    def was_last_pressed(self, key: str) -> bool:
-        return key in self.__last_pressed_keys and self.__last_pressed_keys[key]
+        if self.__terrain is not None:
+            entry = self.__terrain.segment_entry(np.array([start.xy]), np.array([end.xy]))[0]
+            if np.isinf(entry):
+                return None
+
+            hit = start + (end - start) * entry
+            return self.__terrain.floor_at(hit.x, hit.y)
+
+        floor = None
+        for x0, y0, x1, _y1 in self.__platform_grid.query(start.x, start.y, end.x, end.y):
+            if start.y <= y0 < end.y and (floor is None or y0 < floor):
+                # x position when crossing the top edge
+                x = start.x + (end.x - start.x) * (y0 - start.y) / dy
+                if x0 < x < x1:
+                    floor = y0
+
+        return floor
+
+    def carve(self, position: Vec2, radius: float) -> None:
+        """
+        blow a round hole into the terrain (only with destructible terrain)
+        """
+        if self.__terrain is None:
+            return
+
+        carved = self.__terrain.carve(position.x, position.y, radius)
+        if carved is None or self.headless:
+            return
+
+        # only paint over the hole instead of redrawing the whole world
+        rect, removed = carved
+        pixels = pg.surfarray.pixels2d(self.lowest_layer)
+        pixels[rect.left:rect.right, rect.top:rect.bottom][removed] = self.lowest_layer.map_rgb(
+            self.__world_config["background"]
+        )
+        del pixels
+
+        self.mark_dirty(rect)
+
+    @staticmethod
+    def is_pressed(key: str) -> bool:
+        return Inputs.is_held(Inputs.action(key))
+
+    @staticmethod
+    def was_last_pressed(key: str) -> bool:
+        return Inputs.was_held(Inputs.action(key))
 
     def update(self) -> None:
         """
         calls updates on all registered objects n' stuff
         also handles key-presses
         """
-        # clear screen
-        self.screen.fill((0, 0, 0, 0))
-        self.lowest_layer.fill((0, 0, 0, 0))
-        self.middle_layer.fill((0, 0, 0, 0))
-        self.top_layer.fill((0, 0, 0, 0))
-
-        # stuff
         now = time.time()
-        delta = now - self.__last
+        frame_time = now - self.__last
+        self.__last = now
+
+        if self.headless:
+            # nothing to show, only advance the simulation
+            self.simulate(frame_time)
+            Animations.update(frame_time * config.const.T_MULT)
+            return
+
+        # clear screen (lowest_layer is covered by the world)
+        if self.dirty_rendering and self.__last_dirty is not None:
+            for rect in self.__last_dirty:
+                self.middle_layer.fill((0, 0, 0, 0), rect)
+                self.top_layer.fill((0, 0, 0, 0), rect)
 
-        # for the right feel
-        delta *= config.const.T_MULT
+        else:
+            self.middle_layer.fill((0, 0, 0, 0))
+            self.top_layer.fill((0, 0, 0, 0))
 
-        self.__last_pressed_keys = self.__pressed_keys.copy()
+        self.__dirty = []
 
-        su = sd = False
         for event in pg.event.get():
+            Inputs.handle_event(event)
+
             match event.type:
                 case pg.QUIT:
                     self.end()
 
-                case pg.MOUSEBUTTONDOWN:
-                    match event.button:
-                        case 4:
-                            su = True
-
-                        case 5:
-                            sd = True
-
                 case pg.KEYDOWN:
                     match event.key:
                         case pg.K_ESCAPE:
                             self.end()
 
-        self.__pressed_keys["scroll_up"] = su
-        self.__pressed_keys["scroll_down"] = sd
+        # put to mouse
+        FollowsMouse.update(self.top_layer)
 
-        # handle key-presses
-        _keys = pg.key.get_pressed()
-        to_check = list(string.ascii_lowercase)
-        to_check += list(string.digits)
-        to_check += [
-            "SPACE",
-            "LEFT",
-            "RIGHT",
-            "UP"
-        ]
+        self.simulate(frame_time)
 
-        for key in to_check:
-            self.__pressed_keys[key] = eval(f"_keys[pg.K_{key}]")
+        # animations run in real time
+        Animations.update(frame_time * config.const.T_MULT)
 
-        # put to mouse
-        FollowsMouse.update(self.top_layer)
+        # draw everything between the last two ticks
+        Interpolated.interpolate(self.__timestep.alpha)
+
+        # draw health bars and other overlays
+        HasBars.draw(self.top_layer)
+        HasOverlay.draw(self.top_layer)
+
+        # draw updated objects and world
+        for element in self.__to_blit.copy():
+            self.mark_dirty(element[0].blit(element[1], (element[2].x, element[2].y)))
+
+        world_changed = self.draw_world()
+        for rect in self.middle_layer.blits([(sprite.image, sprite.rect) for sprite in Updated.sprites()]):
+            self.mark_dirty(rect)
+
+        for rect in Animations.draw(self.top_layer):
+            self.mark_dirty(rect)
+
+        # draw layers
+        self._render_text()
+        self.__compose(full=world_changed)
+
+    def simulate(self, frame_time: float) -> int:
+        """
+        advance the simulation by the real time of a frame, without drawing
+
+        :returns: the number of ticks that were simulated
+        """
+        # simulate in fixed steps, for the right feel also multiplied by T_MULT
+        ticks = self.__timestep.advance(frame_time)
+        for _ in range(ticks):
+            self.__tick(self.__timestep.tick_time * config.const.T_MULT)
+            Inputs.next_tick()
+
+        return ticks
+
+    def __tick(self, delta: float) -> None:
+        """
+        advance the simulation by one tick
+
+        :param delta: already multiplied by T_MULT
+        """
+        Interpolated.save_positions()
+        Respawning.update(delta)
 
         # calculate stuff
         GravityAffected.calculate_gravity(delta)
         FrictionAffected.calculate_friction(delta)
         WallBouncer.update()
 
+        # same for all projectiles, but vectorized
+        for sprite in Projectiles.step(
+                delta,
+                gravity=config.const.g,
+                bounds=config.const.WINDOW_SIZE,
+                platforms=self.__solids
+        ):
+            # could already be dead from an explosion earlier in the list
+            if sprite.alive():
+                sprite.on_death()
+
         # update Updated group
         Updated.update(delta)
 
         # check for collisions
         CollisionDestroyed.update()
 
-        # draw health bars
-        HasBars.draw(self.top_layer)
-
-        # draw updated objects and world
-        for element in self.__to_blit.copy():
-            element[0].blit(element[1], (element[2].x, element[2].y))
-
-        self.draw_world()
-        Updated.draw(self.middle_layer)
-
-        # draw layers
-        self._render_text()
+    def __compose(self, full: bool = False) -> None:
+        """
+        blit all layers to the screen
+        """
+        if self.dirty_rendering and self.__last_dirty is not None and not full:
+            # only the parts drawn on last frame (now cleared) and this frame changed
+            screen_rect = self.screen.get_rect()
+            rects = [rect.clip(screen_rect) for rect in self.__last_dirty + self.__dirty]
+            rects = [rect for rect in rects if rect.width and rect.height]
+
+            if len(rects) <= self.max_dirty_rects:
+                for rect in rects:
+                    self.screen.blit(self.lowest_layer, rect, rect)
+                    self.screen.blit(self.middle_layer, rect, rect)
+                    self.screen.blit(self.top_layer, rect, rect)
+
+                self.__update_rects = rects
+                self.__last_dirty = self.__dirty
+                return
+
+        # the world is opaque, so it doubles as clearing the screen
         self.screen.blit(self.lowest_layer, (0, 0))
         self.screen.blit(self.middle_layer, (0, 0))
         self.screen.blit(self.top_layer, (0, 0))
 
-        self.__last = now
+        self.__update_rects = None
+
+        # after too many rects the next frame also starts with a full clear
+        if self.dirty_rendering and len(self.__dirty) <= self.max_dirty_rects:
+            self.__last_dirty = self.__dirty
+
+        else:
+            self.__last_dirty = None
+
+    def update_display(self) -> None:
+        """
+        show the current frame, only updates the changed parts in dirty rect mode
+        """
+        if self.headless:
+            # no window, but still don't run faster than the frame rate
+            self.__limiter.wait()
+            return
+
+        if self.__update_rects is None:
+            pg.display.update()
+
+        else:
+            pg.display.update(self.__update_rects)
+
+        # sleep until the next frame is due
+        self.__limiter.wait()
 
     def blit(self, surface: pg.Surface, image: pg.Surface, position: Vec2) -> tuple[pg.Surface, pg.Surface, Vec2]:
         self.__to_blit.append((surface, image, position))
@@ -194,18 +431,108 @@ class _Game:
 
 
 # should be the only instance of the class
-Game = _Game("./worlds/world1.json", config.const.WINDOW_SIZE)
+Game = _Game("./worlds/world1.json", config.const.WINDOW_SIZE, headless=HEADLESS)
 
 
 # groups
 class _Players(pg.sprite.Group):
-    ...
+    """
+    required methods / variables:
+    name: str
+    """
+    def add_internal(self, sprite: pg.sprite.Sprite, layer: tp.Any = None) -> None:
+        super().add_internal(sprite, layer)
+        Entities.add_player(sprite)
+
+    def remove_internal(self, sprite: pg.sprite.Sprite) -> None:
+        super().remove_internal(sprite)
+        Entities.remove_player(sprite)
+
+    @staticmethod
+    def get_by_name(name: str):
+        return Entities.player(name)
 
 
 class _Updated(pg.sprite.Group):
     ...
 
 
+class _Respawning(pg.sprite.Group):
+    """
+    dead players waiting to respawn, still found by name (see `_Players`)
+
+    required methods / variables:
+    name: str
+    respawn_time: float (seconds left, counted down by the simulation)
+    revive() -> None
+    """
+    def add_internal(self, sprite: pg.sprite.Sprite, layer: tp.Any = None) -> None:
+        super().add_internal(sprite, layer)
+        Entities.add_player(sprite)
+
+    def remove_internal(self, sprite: pg.sprite.Sprite) -> None:
+        super().remove_internal(sprite)
+        Entities.remove_player(sprite)
+
+    def update(self, delta: float) -> None:
+        """
+        :param delta: already multiplied by T_MULT
+        """
+        for sprite in self.sprites():
+            sprite: tp.Any
+            sprite.respawn_time -= delta / config.const.T_MULT
+            if sprite.respawn_time <= 0:
+                # leave first, so reviving registers it again
+                self.remove(sprite)
+                sprite.revive()
+
+
+class _Animations(pg.sprite.Group):
+    """
+    required methods / variables:
+    image: pg.Surface
+    rect: pg.Rect
+    surface: pg.Surface (the surface to draw on)
+    update(delta: float) -> None
+    """
+    def draw(self, surface: pg.Surface, *_args) -> list[pg.Rect]:
+        """
+        draw all animations playing on surface in one batch
+        """
+        return surface.blits(
+            [(sprite.image, sprite.rect) for sprite in self.sprites() if sprite.surface is surface]
+        )
+
+
+class _Interpolated(pg.sprite.Group):
+    """
+    required methods / variables:
+    interpolate(alpha: float) -> None (place the rect between the last two ticks)
+    save_position() -> None (optional, remember the position before a tick)
+    """
+    def save_positions(self) -> None:
+        for sprite in self.sprites():
+            with suppress(AttributeError):
+                sprite: tp.Any
+                sprite.save_position()
+
+    def interpolate(self, alpha: float) -> None:
+        for sprite in self.sprites():
+            sprite: tp.Any
+            sprite.interpolate(alpha)
+
+
+class _HasOverlay(pg.sprite.Group):
+    """
+    required methods / variables:
+    draw_overlay(surface: pg.Surface) -> None
+    """
+    def draw(self, surface: pg.Surface, *_args) -> None:
+        for sprite in self.sprites():
+            sprite: tp.Any
+            sprite.draw_overlay(surface)
+
+
 class _UpdatesToNetwork(pg.sprite.Group):
     # required functions / variables:
     # events: list[Event]
@@ -213,28 +540,75 @@ class _UpdatesToNetwork(pg.sprite.Group):
 
 
 class _NetworkUpdated(pg.sprite.Group):
-    def get_by_id(self, id: int):
-        for sprite in self.sprites():
-            if sprite.id == id:
-                return sprite
+    """
+    required methods / variables:
+    id: int (has to be set before adding the sprite)
+    parent: pg.sprite.Sprite (the player that owns it)
+    """
+    def add_internal(self, sprite: pg.sprite.Sprite, layer: tp.Any = None) -> None:
+        super().add_internal(sprite, layer)
+        Entities.add_networked(sprite)
+
+    def remove_internal(self, sprite: pg.sprite.Sprite) -> None:
+        super().remove_internal(sprite)
+        Entities.remove_networked(sprite)
+
+    @staticmethod
+    def get_by_id(id: int, owner: str):
+        return Entities.networked(owner, id)
+
 
+class _PhysicsGroup(pg.sprite.Group):
+    """
+    group whose membership is mirrored as a flag in the projectile store
 
-class _GravityAffected(pg.sprite.Group):
+    sprites with a `physics_slot` are simulated by `Projectiles.step`,
+    everything else is still handled by the group itself
+    """
+    physics_flag: int = 0
+
+    def add_internal(self, sprite: pg.sprite.Sprite, layer: tp.Any = None) -> None:
+        super().add_internal(sprite, layer)
+        slot = getattr(sprite, "physics_slot", -1)
+        if slot >= 0:
+            Projectiles.set_flag(slot, self.physics_flag, True)
+
+    def remove_internal(self, sprite: pg.sprite.Sprite) -> None:
+        super().remove_internal(sprite)
+        slot = getattr(sprite, "physics_slot", -1)
+        if slot >= 0:
+            Projectiles.set_flag(slot, self.physics_flag, False)
+
+    def scalar_sprites(self) -> list[pg.sprite.Sprite]:
+        """
+        all sprites not simulated by the projectile store
+        """
+        return [sprite for sprite in self.sprites() if getattr(sprite, "physics_slot", -1) < 0]
+
+
+class _GravityAffected(_PhysicsGroup):
     """
     required methods / variables:
     velocity: Vec2
     position: Vec2
     """
+    physics_flag = GRAVITY
+
     def calculate_gravity(self, delta: float) -> None:
-        for sprite in self.sprites():
+        for sprite in self.scalar_sprites():
             with suppress(AttributeError):
                 sprite: tp.Any
                 if not sprite.on_ground or sprite.velocity.y < 0:
                     sprite.velocity.y += config.const.g * delta
                     continue
 
-                while sprite.on_ground:
-                    sprite.position.y -= 0.01
+                # snap to the top edge (and over any platforms stacked on it)
+                floor = Game.floor_at(sprite.position)
+                while floor is not None:
+                    sprite.position.y = floor
+                    floor = Game.floor_at(sprite.position)
+
+                # slightly inside, so the sprite stays on the ground
                 sprite.position.y += 0.01
 
                 sprite.velocity.y = 0
@@ -248,13 +622,15 @@ class _FrictionXAffected(pg.sprite.Group):
                 sprite.velocity.x *= 1 - (0.5 * delta)
 
 
-class _FrictionAffected(pg.sprite.Group):
+class _FrictionAffected(_PhysicsGroup):
     """
     required methods / variables:
     velocity: Vec2
     """
+    physics_flag = FRICTION
+
     def calculate_friction(self, delta: float) -> None:
-        for sprite in self.sprites():
+        for sprite in self.scalar_sprites():
             with suppress(AttributeError):
                 sprite: tp.Any
                 sprite.velocity.length -= sprite.velocity.length * delta * 0.01
@@ -281,32 +657,58 @@ class _CollisionDestroyed(pg.sprite.Group):
     hit(damage: float) -> None
     kill() -> None
     """
+    cell_size: int = 128
+    __index: SpatialHash
+
+    def __init__(self, *sprites: pg.sprite.Sprite) -> None:
+        self.__index = SpatialHash(self.cell_size)
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite: pg.sprite.Sprite, layer: tp.Any = None) -> None:
+        super().add_internal(sprite, layer)
+
+        # new sprites should be found by `box_collide` before the next rebuild
+        with suppress(AttributeError):
+            self.__index.insert(sprite)
+
     def update(self) -> None:
-        for sprite in self.sprites():
+        # broadphase: only sprites with overlapping rects are tested
+        self.__index.rebuild(sprite for sprite in self.sprites() if hasattr(sprite, "rect"))
+
+        for sprite, other in list(self.__index.pairs()):
             with suppress(AttributeError):
-                for other in self.sprites():
-                    sprite: tp.Any
-                    other: tp.Any
-                    if all([
-                            pg.sprite.collide_mask(sprite, other),
-                            other != sprite,
-                            other.parent != sprite,
-                            sprite.parent != other
-                    ]):
-                        try:
-                            dmg = other.damage
-
-                        except AttributeError:
-                            dmg = 0
-
-                        hp = sprite.hp
-                        sprite.hit(dmg)
-                        if dmg != 0:
-                            other.hit_someone(target_hp=hp)
+                sprite: tp.Any
+                other: tp.Any
+                if other.parent is sprite or sprite.parent is other:
+                    continue
+
+                # narrowphase
+                if not pg.sprite.collide_mask(sprite, other):
+                    continue
+
+                self.__collide(sprite, other)
+                self.__collide(other, sprite)
+
+    @staticmethod
+    def __collide(sprite: tp.Any, other: tp.Any) -> None:
+        """
+        apply the damage of other to sprite
+        """
+        with suppress(AttributeError):
+            try:
+                dmg = other.damage
+
+            except AttributeError:
+                dmg = 0
+
+            hp = sprite.hp
+            sprite.hit(dmg)
+            if dmg != 0:
+                other.hit_someone(target_hp=hp)
 
     def box_collide(self, other: pg.sprite.Sprite) -> tp.Iterator:
-        for sprite in self.sprites():
-            if pg.sprite.collide_rect(sprite, other) and sprite is not other:
+        for sprite in self.__index.query(other.rect):
+            if sprite is not other and self.has_internal(sprite) and pg.sprite.collide_rect(sprite, other):
                 yield sprite
 
 
@@ -328,33 +730,33 @@ class _HasBars(pg.sprite.Group):
                 max_len = sprite.size
                 now_len = (sprite.hp / sprite.max_hp) * max_len
 
-                bar_start = sprite.position.copy()
-                bar_start.x -= sprite.size / 2
+                # the rect is interpolated, the position isn't
+                bar_start = Vec2.from_cartesian(sprite.rect.left, sprite.rect.bottom)
 
-                pg.draw.rect(
+                Game.mark_dirty(pg.draw.rect(
                     surface,
                     (0, 0, 0, 128),
                     pg.Rect(*bar_start.xy, max_len, bar_height)
-                )
-                pg.draw.rect(
+                ))
+                Game.mark_dirty(pg.draw.rect(
                     surface,
                     (0, 255, 0, 255),
                     pg.Rect(*bar_start.xy, now_len, bar_height)
-                )
+                ))
 
                 # draw mag / reload bar
                 mag_n, mag_v = sprite.weapon_handler.get_mag_state(1000)
                 now_len = (mag_n / 1000) * max_len
-                pg.draw.rect(
+                Game.mark_dirty(pg.draw.rect(
                     surface,
                     (0, 0, 0, 128),
                     pg.Rect(bar_start.x, bar_start.y + 1.5 * bar_height, max_len if now_len else 0, bar_height)
-                )
-                pg.draw.rect(
+                ))
+                Game.mark_dirty(pg.draw.rect(
                     surface,
                     (155, 155, 255, 255),
                     pg.Rect(bar_start.x, bar_start.y + 1.5 * bar_height, now_len, bar_height)
-                )
+                ))
 
                 # draw mag text
                 text_pos = bar_start.copy()
@@ -363,26 +765,28 @@ class _HasBars(pg.sprite.Group):
 
                 # draw cooldown bar
                 now_len = (sprite.weapon_handler.current_cooldown / sprite.weapon.cooldown) * max_len
-                pg.draw.rect(
+                Game.mark_dirty(pg.draw.rect(
                     surface,
                     (0, 0, 0, 128),
                     pg.Rect(bar_start.x, bar_start.y + 2 * 1.5 * bar_height, max_len if now_len else 0, bar_height)
-                )
-                pg.draw.rect(
+                ))
+                Game.mark_dirty(pg.draw.rect(
                     surface,
                     (155, 155, 255, 255),
                     pg.Rect(bar_start.x, bar_start.y + 2 * 1.5 * bar_height, now_len, bar_height)
-                )
+                ))
 
 
-class _WallBouncer(pg.sprite.Group):
+class _WallBouncer(_PhysicsGroup):
     """
     required methods / variables:
     velocity: Vec2
     position: Vec2
     """
+    physics_flag = BOUNCE
+
     def update(self) -> None:
-        for sprite in self.sprites():
+        for sprite in self.scalar_sprites():
             with suppress(AttributeError):
                 sprite: tp.Any
                 if 0 > sprite.position.x:
@@ -401,6 +805,10 @@ class _WallBouncer(pg.sprite.Group):
 # create instances
 Players = _Players()
 Updated = _Updated()
+Respawning = _Respawning()
+Animations = _Animations()
+HasOverlay = _HasOverlay()
+Interpolated = _Interpolated()
 HasBars = _HasBars()
 WallBouncer = _WallBouncer()
 FollowsMouse = _FollowsMouse()
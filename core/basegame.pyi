@@ -2,34 +2,68 @@
 Author:
 Nilusink
 """
+from core.clock import FixedTimestep, FrameLimiter
+from core.spatial import SpatialHash, PlatformGrid
+from core.terrain import Terrain
 from core.new_types import Vec2
 import pygame as pg
+import numpy as np
 import typing as tp
 
 
+HEADLESS: bool
+
+
 class _Game:
+    headless: bool
     screen: pg.Surface
     lowest_layer: pg.Surface
     middle_layer: pg.Surface
     top_layer: pg.Surface
-    font: pg.font.Font
+    font: pg.font.Font | None
+    dirty_rendering: bool
+    destructible_terrain: bool
+    max_dirty_rects: int
+    __dirty: list[pg.Rect]
+    __last_dirty: list[pg.Rect] | None
+    __update_rects: list[pg.Rect] | None
     __to_blit: list[pg.Surface, pg.Surface, Vec2]
     __registered_objects: list[pg.sprite.Sprite]
-    __last_pressed_keys: dict[str, bool]
-    __pressed_keys: dict[str, bool]
+    __world_size: tuple[int, int]
     __platforms: list[dict]
+    __platform_grid: PlatformGrid
+    __terrain: Terrain | None
     __text_to_rend: list[tuple[str, Vec2]]
     __world_config: dict
+    __world_changed: bool
     __last: float
-    def __init__(self, world_path: str, window_size: tuple[int, int] = ...) -> None: ...
+    __timestep: FixedTimestep
+    __limiter: FrameLimiter
+    def __init__(self, world_path: str, window_size: tuple[int, int] = ..., headless: bool = False) -> None: ...
     def load_world(self, world_path: str) -> None: ...
-    def draw_world(self) -> None: ...
+    @property
+    def platform_grid(self) -> PlatformGrid: ...
+    @property
+    def terrain(self) -> Terrain | None: ...
+    @property
+    def __solids(self) -> PlatformGrid | Terrain: ...
+    def draw_world(self) -> bool: ...
     def print(self, text: str, position: Vec2, surface: pg.Surface, color: tuple[float, float, float, float]) -> None: ...
     def _render_text(self) -> None: ...
+    def mark_dirty(self, rect: pg.Rect) -> pg.Rect: ...
     def on_floor(self, point: Vec2) -> bool: ...
-    def is_pressed(self, key: str) -> bool: ...
-    def was_last_pressed(self, key: str) -> bool: ...
+    def floor_at(self, point: Vec2) -> float | None: ...
+    def sweep_floor(self, start: Vec2, end: Vec2) -> float | None: ...
+    def carve(self, position: Vec2, radius: float) -> None: ...
+    @staticmethod
+    def is_pressed(key: str) -> bool: ...
+    @staticmethod
+    def was_last_pressed(key: str) -> bool: ...
     def update(self) -> None: ...
+    def simulate(self, frame_time: float) -> int: ...
+    def __tick(self, delta: float) -> None: ...
+    def __compose(self, full: bool = False) -> None: ...
+    def update_display(self) -> None: ...
     def blit(self, surface: pg.Surface, image: pg.Surface, position: Vec2) -> tuple[pg.Surface, pg.Surface, Vec2]: ...
     def unblit(self, element: tuple[pg.Surface, pg.Surface, Vec2]) -> None: ...
     @staticmethod
@@ -41,13 +75,63 @@ Game: _Game
 
 # groups
 class _Players(pg.sprite.Group):
-    ...
+    """
+    required methods / variables:
+    name: str
+    """
+    def add_internal(self, sprite: pg.sprite.Sprite, layer: tp.Any = None) -> None: ...
+    def remove_internal(self, sprite: pg.sprite.Sprite) -> None: ...
+    @staticmethod
+    def get_by_name(name: str): ...
 
 
 class _Updated(pg.sprite.Group):
     ...
 
 
+class _Respawning(pg.sprite.Group):
+    """
+    dead players waiting to respawn, still found by name (see `_Players`)
+
+    required methods / variables:
+    name: str
+    respawn_time: float (seconds left, counted down by the simulation)
+    revive() -> None
+    """
+    def add_internal(self, sprite: pg.sprite.Sprite, layer: tp.Any = None) -> None: ...
+    def remove_internal(self, sprite: pg.sprite.Sprite) -> None: ...
+    def update(self, delta: float) -> None: ...
+
+
+class _Animations(pg.sprite.Group):
+    """
+    required methods / variables:
+    image: pg.Surface
+    rect: pg.Rect
+    surface: pg.Surface (the surface to draw on)
+    update(delta: float) -> None
+    """
+    def draw(self, surface: pg.Surface, *_args) -> list[pg.Rect]: ...
+
+
+class _Interpolated(pg.sprite.Group):
+    """
+    required methods / variables:
+    interpolate(alpha: float) -> None (place the rect between the last two ticks)
+    save_position() -> None (optional, remember the position before a tick)
+    """
+    def save_positions(self) -> None: ...
+    def interpolate(self, alpha: float) -> None: ...
+
+
+class _HasOverlay(pg.sprite.Group):
+    """
+    required methods / variables:
+    draw_overlay(surface: pg.Surface) -> None
+    """
+    def draw(self, surface: pg.Surface, *_args) -> None: ...
+
+
 class _UpdatesToNetwork(pg.sprite.Group):
     # required functions / variables:
     # events: list[Event]
@@ -55,10 +139,31 @@ class _UpdatesToNetwork(pg.sprite.Group):
 
 
 class _NetworkUpdated(pg.sprite.Group):
-    def get_by_id(self, id: int): ...
+    """
+    required methods / variables:
+    id: int (has to be set before adding the sprite)
+    parent: pg.sprite.Sprite (the player that owns it)
+    """
+    def add_internal(self, sprite: pg.sprite.Sprite, layer: tp.Any = None) -> None: ...
+    def remove_internal(self, sprite: pg.sprite.Sprite) -> None: ...
+    @staticmethod
+    def get_by_id(id: int, owner: str): ...
+
 
+class _PhysicsGroup(pg.sprite.Group):
+    """
+    group whose membership is mirrored as a flag in the projectile store
 
-class _GravityAffected(pg.sprite.Group):
+    sprites with a `physics_slot` are simulated by `Projectiles.step`,
+    everything else is still handled by the group itself
+    """
+    physics_flag: int
+    def add_internal(self, sprite: pg.sprite.Sprite, layer: tp.Any = None) -> None: ...
+    def remove_internal(self, sprite: pg.sprite.Sprite) -> None: ...
+    def scalar_sprites(self) -> list[pg.sprite.Sprite]: ...
+
+
+class _GravityAffected(_PhysicsGroup):
     """
     required methods / variables:
     velocity: Vec2
@@ -71,7 +176,7 @@ class _FrictionXAffected(pg.sprite.Group):
     def calculate_friction(self, delta: float) -> None: ...
 
 
-class _FrictionAffected(pg.sprite.Group):
+class _FrictionAffected(_PhysicsGroup):
     """
     required methods / variables:
     velocity: Vec2
@@ -95,7 +200,13 @@ class _CollisionDestroyed(pg.sprite.Group):
     hit(damage: float) -> None
     kill() -> None
     """
+    cell_size: int
+    __index: SpatialHash
+    def __init__(self, *sprites: pg.sprite.Sprite) -> None: ...
+    def add_internal(self, sprite: pg.sprite.Sprite, layer: tp.Any = None) -> None: ...
     def update(self) -> None: ...
+    @staticmethod
+    def __collide(sprite: tp.Any, other: tp.Any) -> None: ...
     def box_collide(self, other: pg.sprite.Sprite) -> tp.Iterator: ...
 
 
@@ -110,7 +221,7 @@ class _HasBars(pg.sprite.Group):
     def draw(self, surface: pg.Surface) -> None: ...
 
 
-class _WallBouncer(pg.sprite.Group):
+class _WallBouncer(_PhysicsGroup):
     """
     required methods / variables:
     velocity: Vec2
@@ -122,6 +233,10 @@ class _WallBouncer(pg.sprite.Group):
 # create instances
 Players: _Players
 Updated: _Updated
+Respawning: _Respawning
+Animations: _Animations
+HasOverlay: _HasOverlay
+Interpolated: _Interpolated
 HasBars: _HasBars
 WallBouncer: _WallBouncer
 FollowsMouse: _FollowsMouse
@@ -0,0 +1,81 @@
+"""
+Author:
+Nilusink
+
+fixed timestep scheduling and frame limiting
+"""
+import time
+
+
+class FixedTimestep:
+    """
+    splits the real time between frames into ticks of constant length
+
+    the time left over is kept for the next frame, `alpha` tells how far
+    the current frame is between the last two ticks
+    """
+    __tick_time: float
+    __max_frame_time: float
+    __accumulator: float
+
+    def __init__(self, tick_rate: float, max_frame_time: float = .25) -> None:
+        """
+        :param tick_rate: ticks per second
+        :param max_frame_time: longer frames are cut to this, so a hang
+            doesn't cause an endless amount of ticks
+        """
+        self.__tick_time = 1 / tick_rate
+        self.__max_frame_time = max_frame_time
+        self.__accumulator = 0
+
+    @property
+    def tick_time(self) -> float:
+        return self.__tick_time
+
+    @property
+    def alpha(self) -> float:
+        """
+        progress from the last tick to the next one (0 - 1)
+        """
+        return self.__accumulator / self.__tick_time
+
+    def advance(self, frame_time: float) -> int:
+        """
+        add the time of a frame
+
+        :returns: the number of ticks to simulate
+        """
+        self.__accumulator += min(frame_time, self.__max_frame_time)
+
+        ticks = int(self.__accumulator // self.__tick_time)
+        self.__accumulator -= ticks * self.__tick_time
+        return ticks
+
+
+class FrameLimiter:
+    """
+    sleeps until the next frame is due
+    """
+    __frame_time: float
+    __next: float
+
+    def __init__(self, fps: float) -> None:
+        """
+        :param fps: frames per second, 0 for no limit
+        """
+        self.__frame_time = 1 / fps if fps else 0
+        self.__next = time.perf_counter()
+
+    def wait(self) -> None:
+        if not self.__frame_time:
+            return
+
+        now = time.perf_counter()
+        self.__next += self.__frame_time
+
+        if self.__next > now:
+            time.sleep(self.__next - now)
+
+        else:
+            # too slow, don't try to catch up
+            self.__next = now
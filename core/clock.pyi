@@ -0,0 +1,23 @@
+"""
+Author:
+Nilusink
+"""
+
+
+class FixedTimestep:
+    __tick_time: float
+    __max_frame_time: float
+    __accumulator: float
+    def __init__(self, tick_rate: float, max_frame_time: float = .25) -> None: ...
+    @property
+    def tick_time(self) -> float: ...
+    @property
+    def alpha(self) -> float: ...
+    def advance(self, frame_time: float) -> int: ...
+
+
+class FrameLimiter:
+    __frame_time: float
+    __next: float
+    def __init__(self, fps: float) -> None: ...
+    def wait(self) -> None: ...
@@ -4,12 +4,17 @@ Nilusink
 """
 import configparser
 from dataclasses import dataclass
-from threading import Timer
 from random import randint
 import numpy as np
 import time
 
+from core.netsync import SnapshotBuffer
+from core.registry import Entities
 from core.animations import play_animation
+from core.atlas import RotationAtlas
+from core.assets import Assets
+from core.inputs import Inputs
+from core.masks import Masks
 import core.config as config
 from core.new_types import *
 from core.basegame import *
@@ -76,62 +81,124 @@ class Bullet(pg.sprite.Sprite):
     reload_time: float
     cooldown: float
     mag_size: int
-    damage: float
+    base_damage: float
     speed: float
     _size: int = 0
     parent: pg.sprite.Sprite
     character_path: str
     last_angle: float
-    velocity: Vec2
     rect: pg.Rect
+    mask: pg.mask.Mask
     _original_image: pg.Surface
-    _position: Vec2
+    _atlas: RotationAtlas | None = None
+    __frame_index: int
+    physics_slot: int = -1
     id: int
 
+    # only used once the bullet has left the projectile store
+    _position: Vec2
+    _velocity: Vec2
+    _damage: float
+
     def __init__(self, position: Vec2, direction: Vec2, parent: pg.sprite.Sprite, initial_velocity: Vec2 = Vec2()):
         super().__init__()
-        self._position = position
-        self.velocity = direction
         self.last_angle = 0
         self.parent = parent
 
         self.cooldown: float
-        self.damage: float
         self.speed: float
 
-        self.velocity.length = self.speed
-        self.velocity += initial_velocity.split_vector(direction)[0]
+        velocity = direction
+        velocity.length = self.speed
+        velocity = velocity + initial_velocity.split_vector(direction)[0]
 
-        img = pg.image.load(self.character_path)
-        img = pg.transform.scale(img, (self._size, self._size))
-        self._original_image = img
+        # position, velocity and damage live in the projectile store
+        self.physics_slot = Projectiles.add(self, position, velocity, self.base_damage)
 
-        self.image = pg.transform.rotate(self._original_image, -self.velocity.angle * (180 / config.const.PI))
-        self.last_angle = self.velocity.angle
+        atlas = self.get_atlas()
+        self._original_image = atlas.image
+        self.__frame_index = -1
+        self.rect = pg.Rect(0, 0, self._size, self._size)
 
-        self.rect = pg.Rect(
-            self._position.x - self._size / 2,
-            self._position.y - self._size / 2,
-            self._size,
-            self._size
-        )
-        self.id = randint(0, 1_000_000_000)
+        self.__rotate(position, velocity)
+
+        self.id = Entities.new_id()
+
+        self.add(Updated, Interpolated, CollisionDestroyed, FrictionAffected, GravityAffected, WallBouncer)
 
-        self.add(Updated, CollisionDestroyed, FrictionAffected, GravityAffected, WallBouncer)
+    @classmethod
+    def get_atlas(cls) -> RotationAtlas:
+        """
+        rotated images of this weapon, only created once per class
+        """
+        atlas = cls.__dict__.get("_atlas")
+        if atlas is None:
+            img = Assets.image(cls.character_path, (cls._size, cls._size))
+
+            atlas = RotationAtlas(img, config.const.ROTATION_STEP)
+            cls._atlas = atlas
+
+        return atlas
+
+    @classmethod
+    def preload(cls) -> None:
+        cls.get_atlas()
 
     @property
     def position(self) -> Vec2:
-        return self._position
+        if self.physics_slot < 0:
+            return self._position
+
+        return Projectiles.stored_position(self.physics_slot, self)
+
+    @position.setter
+    def position(self, value: Vec2) -> None:
+        if self.physics_slot < 0:
+            self._position = value
+            return
+
+        Projectiles.set_position(self.physics_slot, value)
+
+    @property
+    def velocity(self) -> Vec2:
+        if self.physics_slot < 0:
+            return self._velocity
+
+        return Projectiles.stored_velocity(self.physics_slot, self)
+
+    @velocity.setter
+    def velocity(self, value: Vec2) -> None:
+        if self.physics_slot < 0:
+            self._velocity = value
+            return
+
+        Projectiles.set_velocity(self.physics_slot, value)
+
+    @property
+    def damage(self) -> float:
+        if self.physics_slot < 0:
+            return self._damage
+
+        return Projectiles.get_damage(self.physics_slot)
+
+    @damage.setter
+    def damage(self, value: float) -> None:
+        if self.physics_slot < 0:
+            self._damage = value
+            return
+
+        Projectiles.set_damage(self.physics_slot, value)
 
     @property
     def on_ground(self) -> bool:
-        return Game.on_floor(self._position)
+        return Game.on_floor(self.position)
 
     @property
     def out_of_bounds(self) -> bool:
+        position = self.position
         return all([
-            not -200 < self._position.x < config.const.WINDOW_SIZE[0] + 200,
-            not -200 < self._position.y < config.const.WINDOW_SIZE[1] + 200,
+            not -200 < position.x < config.const.WINDOW_SIZE[0] + 200,
+            not -200 < position.y < config.const.WINDOW_SIZE[1] + 200,
         ])
 
     def get_nearest_player(self, exclude_parent: bool) -> tp.Union["Player", None]:
@@ -142,7 +209,7 @@ class Bullet(pg.sprite.Sprite):
                 continue
 
             player: Player
-            dist = abs((self._position - player.position).length)
+            dist = abs((self.position - player.position).length)
             if dist < closest_distance:
                 closest_player = player
                 closest_distance = dist
@@ -152,21 +219,32 @@ class Bullet(pg.sprite.Sprite):
     def update(self, delta: float) -> None:
         self._update(delta)
 
-    def _update(self, delta: float) -> None:
-        self._position += self.velocity * delta
+    def __rotate(self, position: Vec2, velocity: Vec2) -> None:
+        """
+        point the image (and mask) in the direction of velocity
+        """
+        atlas = self.get_atlas()
+        if velocity.angle != self.last_angle or self.__frame_index < 0:
+            index = atlas.index(-velocity.angle * (180 / config.const.PI))
+            if index != self.__frame_index:
+                self.image = atlas.frame(index)
+                self.mask = atlas.mask(index)
+                self.__frame_index = index
+
+            self.last_angle = velocity.angle
 
-        if self.out_of_bounds or self.on_ground:
-            self.on_death()
+        atlas.place(self.__frame_index, self.rect, position.x, position.y)
 
-        self.image = pg.transform.rotate(self._original_image, -self.velocity.angle * (180 / config.const.PI))
-        self.last_angle = self.velocity.angle
+    def _update(self, _delta: float) -> None:
+        # movement and culling are done by `Projectiles.step`
+        self.__rotate(self.position, self.velocity)
 
-        self.rect = pg.Rect(
-            self._position.x - self._size / 2,
-            self._position.y - self._size / 2,
-            self._size,
-            self._size
-        )
+    def interpolate(self, alpha: float) -> None:
+        if self.physics_slot < 0:
+            return
+
+        x, y = Projectiles.get_interpolated(self.physics_slot, alpha)
+        self.get_atlas().place(self.__frame_index, self.rect, x, y)
 
     def hit(self, _damage: float) -> None:
         self.on_death()
@@ -179,13 +257,24 @@ class Bullet(pg.sprite.Sprite):
     def on_death(self) -> None:
         self.kill()
 
+    def kill(self) -> None:
+        super().kill()
+
+        # detach from the projectile store, keep the last known state
+        if self.physics_slot >= 0:
+            self._position = Projectiles.get_position(self.physics_slot)
+            self._velocity = Projectiles.get_velocity(self.physics_slot)
+            self._damage = self.damage
+            Projectiles.remove(self.physics_slot)
+            self.physics_slot = -1
+
 
 class AK47(Bullet):
     character_path: str = "./images/weapons/bullet.png"
     reload_time = config.const.BULLET_RELOAD_TIME
     mag_size = config.const.BULLET_MAG_SIZE
     cooldown = config.const.BULLET_COOLDOWN
-    damage = config.const.BULLET_DAMAGE
+    base_damage = config.const.BULLET_DAMAGE
     speed = config.const.BULLET_SPEED
     _size = 16
 
@@ -198,10 +287,16 @@ class Rocket(Bullet):
     cooldown: float = config.const.ROCKET_COOLDOWN
     exp_damage: float = config.const.ROCKET_DAMAGE  # damage for explosions
     speed: float = config.const.ROCKET_SPEED
-    damage: float = 10   # damage for direct hits
+    base_damage: float = 10   # damage for direct hits
+    explosion_size: int = 100
     _size = 64
     hp = 2
 
+    @classmethod
+    def preload(cls) -> None:
+        super().preload()
+        Assets.directory(cls.explosion_animation, (cls.explosion_size, cls.explosion_size))
+
     def hit(self, damage: float) -> None:
         self.hp -= damage
         if self.hp <= 0:
@@ -211,7 +306,7 @@ class Rocket(Bullet):
         self.on_death()
 
     def on_death(self) -> None:
-        size = Vec2.from_cartesian(100, 100)
+        size = Vec2.from_cartesian(self.explosion_size, self.explosion_size)
         play_animation(
             directory=self.explosion_animation,
             position=self.position.copy(),
@@ -232,6 +327,8 @@ class Rocket(Bullet):
             if sprite is not self and not issubclass(type(sprite), Rocket):
                 sprite.hit(self.exp_damage)
 
+        Game.carve(self.position, self.explosion_size / 2)
+
         self.kill()
 
 
@@ -246,16 +343,16 @@ class HomingRocket(Rocket):
     __grad_per_sec: float = 60
     __rad_per_sec: float
     __events: list[Event]
+    __debug_lines: list[tuple[tuple[int, int, int, int], Vec2, Vec2]]
 
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
         self.__rad_per_sec = self.__grad_per_sec * (config.const.PI / 180)
 
         self.__events = []
+        self.__debug_lines = []
 
-        self._id = randint(0, 1_000_000_000)
-
-        self.add(UpdatesToNetwork)
+        self.add(UpdatesToNetwork, HasOverlay)
         self.remove(GravityAffected)
 
     @property
@@ -265,19 +362,21 @@ class HomingRocket(Rocket):
         return tmp
 
     def update(self, delta: float) -> None:
+        velocity = self.velocity
+        self.__debug_lines = []
         target: Player = self.get_nearest_player(exclude_parent=True)
         if target:
             position_delta = target.position_center - self.position
-            angle_delta = self.velocity.angle - position_delta.angle
+            angle_delta = velocity.angle - position_delta.angle
 
             while angle_delta > 2*config.const.PI:
                 angle_delta -= 2*config.const.PI
 
-            end = self.position + Vec2.from_polar(angle=angle_delta+self.velocity.angle, length=50)
-            pg.draw.line(Game.top_layer, (255, 0, 0, 255), self.position.xy, end.xy)
+            end = self.position + Vec2.from_polar(angle=angle_delta+velocity.angle, length=50)
+            self.__debug_lines.append(((255, 0, 0, 255), self.position, end))
 
             end = self.position + Vec2.from_polar(angle=angle_delta, length=50)
-            pg.draw.line(Game.top_layer, (0, 0, 255, 255), self.position.xy, end.xy)
+            self.__debug_lines.append(((0, 0, 255, 255), self.position, end))
 
             sign = 1
             if angle_delta > 0.001:
@@ -289,21 +388,26 @@ class HomingRocket(Rocket):
                 to_change *= -1
 
             end = self.position + Vec2.from_polar(angle=to_change, length=700)
-            pg.draw.line(Game.top_layer, (0, 255, 0, 255), self.position.xy, end.xy)
+            self.__debug_lines.append(((0, 255, 0, 255), self.position, end))
 
-            self.velocity.angle += to_change
+            velocity.angle += to_change
 
-        self.velocity.length += self.acceleration * delta
+        velocity.length += self.acceleration * delta
+        self.velocity = velocity
 
         self._update(delta)
 
+    def draw_overlay(self, surface: pg.Surface) -> None:
+        for color, start, end in self.__debug_lines:
+            Game.mark_dirty(pg.draw.line(surface, color, start.xy, end.xy))
+
 
 class Sniper(Bullet):
     character_path: str = "./images/weapons/bullet.png"
     reload_time = config.const.SNIPER_RELOAD_TIME
     mag_size = config.const.SNIPER_MAG_SIZE
     cooldown = config.const.SNIPER_COOLDOWN
-    damage = config.const.SNIPER_DAMAGE
+    base_damage = config.const.SNIPER_DAMAGE
     speed = config.const.SNIPER_SPEED
     _size = 32
 
@@ -403,8 +507,7 @@ class WeaponHandler:
             direction.length = 100
 
             # calculate position
-            pos = direction
-            pos += self.__parent.position_center
+            pos = direction + self.__parent.position_center
 
             # create bullet instance
             b = self.__weapon(pos, direction, self.__parent, self.__parent.velocity)
@@ -430,13 +533,21 @@ class Player(pg.sprite.Sprite):
     position: Vec2
     respawns: bool
     image: pg.Surface
+    mask: pg.mask.Mask
     mouse_center: Vec2
     bullet_offset: Vec2
     parent: pg.sprite.Sprite
+    snapshots: SnapshotBuffer | None
     controls: tuple[str, str, str, str]
+    control_actions: tuple[int, ...]
+    reload_action: int = Inputs.action("r")
+    scroll_up_action: int = Inputs.action("scroll_up")
+    scroll_down_action: int = Inputs.action("scroll_down")
     max_speed: float = config.const.MAX_SPEED
     jump_speed: float = config.const.JUMP_SPEED
     character_path: str = "./images/characters/amogus/amogusSIZEDIRECTION.png"
+    respawn_delay: float = 4.20
+    respawn_time: float = 0
 
     # private
     __weapon_indicator: "WeaponIndicator"
@@ -453,6 +564,8 @@ class Player(pg.sprite.Sprite):
     __controlled: bool
     __spawn: Vec2
     __size: int = 32
+    __previous_position: Vec2
+    __aim: Vec2 | None
 
     def __init__(self,
                  spawn_point: Vec2,
@@ -462,8 +575,13 @@ class Player(pg.sprite.Sprite):
                  controls: tuple[str, str, str, str] = ("", "", "", ""),
                  shoots: bool = False,
                  respawns: bool = False,
-                 name: str = ""
+                 name: str = "",
+                 networked: bool = False
                  ) -> None:
+        """
+        :param networked: controlled by another client, only moves along the
+            states received from the server (see `Connection.apply_updates`)
+        """
 
         if velocity is ...:
             velocity = Vec2()
@@ -492,12 +610,16 @@ class Player(pg.sprite.Sprite):
         self.__spawn = spawn_point
         self.velocity = velocity
         self.controls = controls
+        self.control_actions = tuple(Inputs.action(key) for key in controls) if controlled else ()
         self.respawns = respawns
         self.shoots = shoots
         self.name = name
+        self.snapshots = SnapshotBuffer() if networked else None
 
         # player config
         self.hp = self._max_hp
+        self.__previous_position = self.position.copy()
+        self.__aim = None
 
         self.bullet_offset: Vec2 = Vec2.from_cartesian(
             x=0,
@@ -508,21 +630,32 @@ class Player(pg.sprite.Sprite):
 
         self.__cooldown: list[float] = [0] * len(self.available_weapons)
 
-        image = pg.image.load(self.character_path
-                              .replace("SIZE", str(self.__size))
-                              .replace("DIRECTION", self.facing)
-                              )
-        self.image = pg.transform.scale(image, (self.__size, self.__size))
+        image_path = self.character_path.replace("SIZE", str(self.__size)).replace("DIRECTION", self.facing)
+        self.image = Assets.image(image_path, (self.__size, self.__size))
+        self.mask = Masks.get(self.image, key=image_path)
         self.update_rect()
 
         # add to the player group
-        self.__groups = [Players, Updated, GravityAffected, FrictionXAffected, CollisionDestroyed, HasBars]
+        self.__groups = [
+            Players, Updated, Interpolated, GravityAffected, FrictionXAffected, CollisionDestroyed, HasBars, HasOverlay
+        ]
+        if networked:
+            # already simulated by its client
+            self.__groups.remove(GravityAffected)
+            self.__groups.remove(FrictionXAffected)
+
         self.add(*self.__groups)
 
         self.__weapon_indicator: WeaponIndicator = ...
         if self.shoots:
             self.__weapon_indicator = WeaponIndicator(Vec2.from_cartesian(0, 0), self.weapon)
 
+    @classmethod
+    def preload(cls) -> None:
+        for direction in ("left", "right"):
+            image_path = cls.character_path.replace("SIZE", str(cls.__size)).replace("DIRECTION", direction)
+            Masks.get(Assets.image(image_path, (cls.__size, cls.__size)), key=image_path)
+
     @property
     def weapon_offset(self) -> Vec2:
         return Vec2.from_cartesian(x=self.size / 2, y=self.size / 2)
@@ -589,9 +722,9 @@ class Player(pg.sprite.Sprite):
             raise ValueError(f"Invalid Direction: \"{direction}\"")
 
         self.__facing = direction
-        self.image = pg.image.load(self.character_path
-                                   .replace("SIZE", str(self.size))
-                                   .replace("DIRECTION", self.facing))
+        image_path = self.character_path.replace("SIZE", str(self.size)).replace("DIRECTION", self.facing)
+        self.image = Assets.image(image_path, (self.size, self.size))
+        self.mask = Masks.get(self.image, key=image_path)
         match direction:
             case "right":
                 self.bullet_offset.x = self.size
@@ -631,33 +764,58 @@ class Player(pg.sprite.Sprite):
 
         return closest_player
 
-    def update_rect(self) -> None:
-        self.rect = pg.Rect(self.position.x - self.size / 2, self.position.y - self.size, self.size, self.size)
+    def update_rect(self, position: Vec2 = ...) -> None:
+        if position is ...:
+            position = self.position
+
+        self.rect = pg.Rect(position.x - self.size / 2, position.y - self.size, self.size, self.size)
+
+    def save_position(self) -> None:
+        self.__previous_position = self.position.copy()
+
+    def interpolate(self, alpha: float) -> None:
+        if self.snapshots is not None:
+            # drawn at the time of the frame, not between two ticks
+            sampled = self.snapshots.sample(time.perf_counter())
+            if sampled is not None:
+                self.update_rect(sampled[0])
+                return
+
+        self.update_rect(self.__previous_position + (self.position - self.__previous_position) * alpha)
+
+    def draw_overlay(self, surface: pg.Surface) -> None:
+        # aiming pointer, around the (interpolated) center
+        if self.__aim is None:
+            return
+
+        center = Vec2.from_cartesian(*self.rect.center)
+        self.__aim.length = 60
+        to = center + self.__aim
+        self.__aim.length = 20
+        start = center + self.__aim
+        Game.mark_dirty(pg.draw.line(surface, (255, 0, 0, 255), start.xy, to.xy))
 
     def update(self, delta: float) -> None:
         for i, cooldown in enumerate(self.__cooldown):
             self.__cooldown[i] = cooldown - delta / config.const.T_MULT if cooldown > 0 else 0
 
         if self.__controlled:
-            if Game.is_pressed(self.controls[0]):
+            right, left, jump, drop = (Inputs.is_held(action) for action in self.control_actions)
+            if right:
                 self.velocity.x = self.max_speed  # if self.velocity.x < self.max_speed else self.max_speed
 
-            if Game.is_pressed(self.controls[1]):
+            if left:
                 self.velocity.x = -self.max_speed  # if -self.velocity.x > -self.max_speed else -self.max_speed
 
-            if Game.is_pressed(self.controls[3]):
-                self.__on_ground_override = True
-
-            else:
-                self.__on_ground_override = False
+            self.__on_ground_override = drop
 
-            if not Game.is_pressed(self.controls[0]) and not Game.is_pressed(self.controls[1]):
+            if not right and not left:
                 self.velocity.x = 0
 
-            if Game.is_pressed(self.controls[2]) and self.on_ground:
+            if jump and self.on_ground:
                 self.velocity.y -= self.jump_speed
 
-            if Game.is_pressed("r"):
+            if Inputs.is_held(self.reload_action):
                 self.__weapon.reload()
 
         # update aiming pointer
@@ -666,20 +824,17 @@ class Player(pg.sprite.Sprite):
             mouse_pos = Vec2.from_cartesian(*mouse_pos)
 
             direction = mouse_pos - self.mouse_center
-            direction.length = 60
-            to = self.position_center + direction
             direction.length = 20
-            start = self.position_center + direction
-            pg.draw.line(Game.top_layer, (255, 0, 0, 255), start.xy, to.xy)
+            self.__aim = direction.copy()
 
             if pg.mouse.get_pressed()[0]:
                 if not self.cooldown:
                     self.shoot(direction)
 
-        if Game.is_pressed("scroll_down"):
+        if Inputs.is_held(self.scroll_down_action):
             self.weapon_index -= 1
 
-        if Game.is_pressed("scroll_up"):
+        if Inputs.is_held(self.scroll_up_action):
             self.weapon_index += 1
 
         # check if out of map
@@ -695,7 +850,20 @@ class Player(pg.sprite.Sprite):
                 self.facing = "left"
 
         # update position
-        self.position += self.velocity * delta
+        if self.snapshots is not None:
+            sampled = self.snapshots.sample(time.perf_counter())
+            if sampled is not None:
+                self.position, self.velocity = sampled
+
+        else:
+            previous = self.position.copy()
+            self.position += self.velocity * delta
+
+            # don't fall through thin platforms when falling fast
+            if self.velocity.y > 0 and not self.__on_ground_override:
+                floor = Game.sweep_floor(previous, self.position)
+                if floor is not None:
+                    self.position.y = floor + 0.01
 
         # update on screen
         self.update_rect()
@@ -725,10 +893,21 @@ class Player(pg.sprite.Sprite):
         if self.hp <= 0:
             self.on_death()
 
+    def set_hp(self, hp: float) -> None:
+        """
+        take hp decided somewhere else (the server), dies when they drop to 0
+        """
+        alive = self.hp > 0
+        self.hp = hp
+        if alive and hp <= 0:
+            self.on_death()
+
     def on_death(self) -> None:
         self.kill()
         if self.respawns:
-            Timer(4.20, self.revive).start()
+            # revived by the simulation, not from another thread
+            self.respawn_time = self.respawn_delay
+            self.add(Respawning)
 
     def revive(self) -> None:
         print(f"revived")
@@ -739,6 +918,7 @@ class Player(pg.sprite.Sprite):
         self.position = Vec2.from_cartesian(self.__spawn.x, self.__spawn.y)
         self.velocity = Vec2()
         self.hp = self.max_hp
+        self.save_position()
         self.update(delta=0)
 
         # re-ad to groups
@@ -775,29 +955,29 @@ class Scope(pg.sprite.Sprite):
     image: pg.Surface
     position: Vec2
     rect: pg.Rect
-    size: int
+    size: int = 16
 
     def __init__(self):
         super().__init__()
 
         self.position = Vec2()
-        img = pg.image.load(self.character_path)
-        self.size = 16
-
-        img = pg.transform.scale(img, (self.size, self.size))
-        self.image = img
+        self.image = Assets.image(self.character_path, (self.size, self.size))
 
         self.rect = pg.Rect(self.position.x, self.position.y, self.size, self.size)
 
         self.add(Updated, FollowsMouse)
 
+    @classmethod
+    def preload(cls) -> None:
+        Assets.image(cls.character_path, (cls.size, cls.size))
+
     def update(self, _delta: float) -> None:
         self.rect = pg.Rect(self.position.x, self.position.y-self.size*2, self.size, self.size)
 
 
 class WeaponIndicator(pg.sprite.Sprite):
     character_path: str = "./images/weapons/WEAPON.png"
-    scale: tuple[int, int]
+    scale: tuple[int, int] = (80, 40)
     images: pg.surface
     position: Vec2
     rect: pg.Rect
@@ -810,13 +990,21 @@ class WeaponIndicator(pg.sprite.Sprite):
         self.position = sign_position
         self.scale: tuple[int, int] = (80, 40)
 
-        self.__orig_img = pg.image.load(self.character_path.replace("WEAPON", self.__weapon.__name__.lower()))
-        self.image = pg.transform.scale(self.__orig_img, self.scale)
+        self.image = self.get_image(self.__weapon)
 
         self.rect = pg.Rect(self.position.x, self.position.y, *self.scale)
 
         self.add(Updated)
 
+    @classmethod
+    def get_image(cls, weapon: tp.Type[Bullet]) -> pg.Surface:
+        return Assets.image(cls.character_path.replace("WEAPON", weapon.__name__.lower()), cls.scale)
+
+    @classmethod
+    def preload(cls) -> None:
+        for weapon in (AK47, Sniper, Rocket, HomingRocket):
+            cls.get_image(weapon)
+
     @property
     def weapon(self) -> tp.Type[Bullet]:
         return self.__weapon
@@ -824,5 +1012,9 @@ class WeaponIndicator(pg.sprite.Sprite):
     @weapon.setter
     def weapon(self, weapon: tp.Type[Bullet]) -> None:
         self.__weapon = weapon
-        img = pg.image.load(self.character_path.replace("WEAPON", self.__weapon.__name__.lower()))
-        self.image = pg.transform.scale(img, self.scale)
\ No newline at end of file
+        self.image = self.get_image(self.__weapon)
+
+
+# build every image before the first frame
+for _asset_user in (AK47, Sniper, Rocket, HomingRocket, Player, Scope, WeaponIndicator):
+    Assets.add_preload_hook(_asset_user.preload)
\ No newline at end of file
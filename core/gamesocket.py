@@ -5,6 +5,8 @@ melektron
 class that handles receiving and sending packets
 """
 
+from core.protocol import PROTOCOL_VERSION, LEGACY_VERSION, HELLO_MAGIC, HELLO_SIZE, START_MARKER, END_MARKER
+from core.protocol import FRAME_HEADER, MAX_FRAME_SIZE, ProtocolError, hello, parse_hello, encode, decode
 import socket
 import _socket
 import json
@@ -14,47 +16,248 @@ global_input_buffer: dict = {}
 
 
 class GameSocket(socket.socket):
-    input_buffer: bytes = b""
+    """
+    received bytes are kept in one preallocated buffer, filled with `recv_into`
+    and only moved to its front when the end is reached, frames are decoded
+    straight from memoryviews of it
+
+    packets can be collected with `queue_packet` and sent together by `flush`
+    (once per tick), so the kernel doesn't have to send many tiny segments
+    """
+    protocol_version: int = LEGACY_VERSION
+    negotiation_timeout: float = 1
+    buffer_size: int = 65536
+    min_receive: int = 4096
+    max_send_buffers: int = 1024    # IOV_MAX on linux
+    __buffer: bytearray
+    __view: memoryview
+    __start: int
+    __end: int
+    __outgoing: list[bytes]
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+
+        self.__buffer = bytearray(self.buffer_size)
+        self.__view = memoryview(self.__buffer)
+        self.__start = 0    # first byte that wasn't parsed yet
+        self.__end = 0      # end of the received bytes
+        self.__outgoing = []
+
+        if self.family in (socket.AF_INET, socket.AF_INET6) and self.type == socket.SOCK_STREAM:
+            # packets are already batched per tick, waiting for more (nagle) only adds latency
+            self.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    @property
+    def pending(self) -> int:
+        """
+        number of received bytes that weren't parsed yet
+        """
+        return self.__end - self.__start
+
+    def reset_input(self) -> None:
+        """
+        drop everything that was received but not parsed yet
+        """
+        self.__start = self.__end = 0
+
+    def negotiate(self) -> int:
+        """
+        offer the newest protocol version to the server, call right after connecting
+
+        servers that don't answer only speak version 1
+        """
+        self.sendall(hello())
+        answer = self.__recv_hello()
+        version = parse_hello(answer)
+
+        if version is None:
+            # old server, keep whatever it already sent
+            self.__push(answer)
+            version = LEGACY_VERSION
+
+        self.protocol_version = min(version, PROTOCOL_VERSION)
+        return self.protocol_version
+
+    def accept_negotiation(self) -> int:
+        """
+        answer the hello of a client, call right after accepting
+
+        clients that don't send one only speak version 1
+        """
+        offer = self.__recv_hello()
+        version = parse_hello(offer)
+
+        if version is None:
+            # old client, keep whatever it already sent
+            self.__push(offer)
+            version = LEGACY_VERSION
+
+        else:
+            version = min(version, PROTOCOL_VERSION)
+            self.sendall(hello(version))
+
+        self.protocol_version = version
+        return version
+
+    def __recv_hello(self) -> bytes:
+        """
+        receive a hello (or whatever arrives before the negotiation timeout),
+        stops as soon as the data can't be a hello anymore
+        """
+        data = b""
+        timeout = self.gettimeout()
+        self.settimeout(self.negotiation_timeout)
+        try:
+            while len(data) < HELLO_SIZE and HELLO_MAGIC.startswith(data[:len(HELLO_MAGIC)]):
+                chunk = self.recv(HELLO_SIZE - len(data))
+                if chunk == b"":
+                    break
+
+                data += chunk
+
+        except TimeoutError:
+            pass
+
+        finally:
+            self.settimeout(timeout)
+
+        return data
 
     def send_packet(self, packet: dict) -> None:
-        spacket = f"\x01{json.dumps(packet)}\x04"
-        print("sending", len(spacket), "bytes")
-        self.send(spacket.encode("ASCII"))
+        self.sendall(encode(packet, self.protocol_version))
+
+    def queue_packet(self, packet: dict) -> None:
+        """
+        encode a packet now, but only send it with the next `flush`
+        """
+        self.__outgoing.append(encode(packet, self.protocol_version))
+
+    def flush(self) -> None:
+        """
+        send all queued packets with as few system calls as possible
+        """
+        if not self.__outgoing:
+            return
+
+        outgoing, self.__outgoing = self.__outgoing, []
+
+        if not hasattr(self, "sendmsg"):
+            # windows
+            self.sendall(b"".join(outgoing))
+            return
+
+        # scatter / gather, the packets don't have to be joined
+        views = [memoryview(data) for data in outgoing]
+        first = 0
+        while first < len(views):
+            sent = self.sendmsg(views[first:first + self.max_send_buffers])
+            while first < len(views) and sent >= len(views[first]):
+                sent -= len(views[first])
+                first += 1
+
+            if sent:
+                views[first] = views[first][sent:]
 
     def recv_packet(self) -> dict:
-        store_bytes: bool = False
-        msg_body: str = ""
-        msg: bytes = b""
+        if self.protocol_version == LEGACY_VERSION:
+            return self.__recv_legacy()
+
+        return self.__recv_frame()
+
+    def __make_room(self, size: int) -> None:
+        """
+        make sure at least size bytes fit behind the received ones
+        """
+        if self.__start == self.__end:
+            self.__start = self.__end = 0
+
+        if len(self.__buffer) - self.__end >= size:
+            return
+
+        # move the unparsed bytes to the front
+        pending = self.__end - self.__start
+        self.__buffer[:pending] = self.__buffer[self.__start:self.__end]
+        self.__start, self.__end = 0, pending
+
+        if len(self.__buffer) - self.__end < size:
+            # a bytearray can't be resized while it is viewed
+            self.__view.release()
+            self.__buffer.extend(bytes(max(size - (len(self.__buffer) - self.__end), len(self.__buffer))))
+            self.__view = memoryview(self.__buffer)
+
+    def __push(self, data: bytes) -> None:
+        """
+        add bytes that were received without the buffer (e.g. while negotiating)
+        """
+        self.__make_room(len(data))
+        self.__buffer[self.__end:self.__end + len(data)] = data
+        self.__end += len(data)
+
+    def __receive(self, needed: int = 1) -> None:
+        """
+        receive new bytes into the buffer
+
+        :param needed: how many bytes are still missing (only used to make room)
+        """
+        self.__make_room(max(needed, self.min_receive))
+
+        received = self.recv_into(self.__view[self.__end:])
+
+        if not received:
+            raise ValueError
+
+        self.__end += received
+
+    def __recv_frame(self) -> dict:
+        """
+        version 2: length-prefixed frames
+        """
+        while True:
+            available = self.__end - self.__start
+            needed = FRAME_HEADER.size
+
+            if available >= FRAME_HEADER.size:
+                length, kind = FRAME_HEADER.unpack_from(self.__buffer, self.__start)
+                if length > MAX_FRAME_SIZE:
+                    raise ProtocolError(f"frame too large: {length} bytes")
+
+                needed += length
+                if available >= needed:
+                    payload_start = self.__start + FRAME_HEADER.size
+                    self.__start += needed
+
+                    return decode(kind, self.__view[payload_start:payload_start + length])
+
+            # read new bytes if the frame isn't complete yet
+            self.__receive(needed - available)
+
+    def __recv_legacy(self) -> dict:
+        """
+        version 1: json between start and end markers
+        """
         while True:
-            # include unused bytes from last receive
-            current_buffer = self.input_buffer + msg
-            for index, byte in enumerate(current_buffer):
-                match byte:
-                    case 0x01:  # start marker
-                        store_bytes = True
-
-                    case 0x04:  # end marker
-                        if index == 0:
-                            continue
-
-                        # store rest of bytes for next call
-                        self.input_buffer = current_buffer[index:]
-                        # parse msg_body as json and return
-                        try:
-                            return json.loads(msg_body)
-
-                        except json.decoder.JSONDecodeError:
-                            print(f"Error (json): [{len(msg_body)}]")
-
-                    case _:  # content
-                        if store_bytes:    # only store bytes between start and end marker
-                            msg_body += current_buffer[index:index+1].decode("ASCII")
+            start = self.__buffer.find(START_MARKER, self.__start, self.__end)
+            if start == -1:
+                # nothing useful in there
+                self.__start = self.__end
+
+            else:
+                self.__start = start
+                end = self.__buffer.find(END_MARKER, start, self.__end)
+                if end != -1:
+                    self.__start = end + 1
+
+                    try:
+                        return json.loads(self.__buffer[start + 1:end])
+
+                    except json.decoder.JSONDecodeError:
+                        print(f"Error (json): [{end - start - 1}]")
+                        continue
 
             # read new bytes if end of message has not been reached
-            msg: bytes = self.recv(1024)
-            if msg == b"":
-                raise ValueError
-    
+            self.__receive()
+
     @classmethod
     def from_socket(cls, sock: socket.socket):
         fd = _socket.dup(sock.fileno())
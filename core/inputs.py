@@ -0,0 +1,123 @@
+"""
+Author:
+Nilusink
+
+keyboard and mouse wheel input
+"""
+import pygame as pg
+
+
+# mouse wheel "keys"
+MOUSE_ACTIONS: dict[str, int] = {
+    "scroll_up": 4,
+    "scroll_down": 5,
+}
+
+
+class InputHandler:
+    """
+    maps key names to action ids once, the state of every action
+    is kept in arrays indexed by its id and updated from events
+    """
+    __actions: dict[str, int]
+    __key_actions: dict[int, list[int]]
+    __button_actions: dict[int, list[int]]
+    __momentary: list[int]
+    __held: bytearray
+    __last_held: bytearray
+    __pressed: bytearray
+    __released: bytearray
+
+    def __init__(self) -> None:
+        self.__actions = {}
+        self.__key_actions = {}
+        self.__button_actions = {}
+        self.__momentary = []
+
+        self.__held = bytearray()
+        self.__last_held = bytearray()
+        self.__pressed = bytearray()
+        self.__released = bytearray()
+
+    def action(self, name: str) -> int:
+        """
+        get the action id of a key name (e.g. "a", "SPACE", "scroll_up")
+        """
+        if name in self.__actions:
+            return self.__actions[name]
+
+        action_id = len(self.__actions)
+        if name in MOUSE_ACTIONS:
+            self.__button_actions.setdefault(MOUSE_ACTIONS[name], []).append(action_id)
+            self.__momentary.append(action_id)
+
+        else:
+            try:
+                keycode = getattr(pg, f"K_{name}")
+
+            except AttributeError:
+                raise ValueError(f"Invalid key: \"{name}\"") from None
+
+            self.__key_actions.setdefault(keycode, []).append(action_id)
+
+        self.__actions[name] = action_id
+        for state in (self.__held, self.__last_held, self.__pressed, self.__released):
+            state.append(0)
+
+        return action_id
+
+    def next_tick(self) -> None:
+        """
+        reset the per tick states, call after every simulation tick
+
+        events are only consumed by ticks, so a frame without a tick keeps them
+        """
+        self.__last_held[:] = self.__held
+        self.__pressed[:] = bytes(len(self.__pressed))
+        self.__released[:] = bytes(len(self.__released))
+
+        # the mouse wheel is only "held" for one tick
+        for action_id in self.__momentary:
+            self.__held[action_id] = 0
+
+    def handle_event(self, event: pg.event.Event) -> None:
+        match event.type:
+            case pg.KEYDOWN:
+                for action_id in self.__key_actions.get(event.key, ()):
+                    self.__held[action_id] = 1
+                    self.__pressed[action_id] = 1
+
+            case pg.KEYUP:
+                for action_id in self.__key_actions.get(event.key, ()):
+                    self.__held[action_id] = 0
+                    self.__released[action_id] = 1
+
+            case pg.MOUSEBUTTONDOWN:
+                for action_id in self.__button_actions.get(event.button, ()):
+                    self.__held[action_id] = 1
+                    self.__pressed[action_id] = 1
+
+    def is_held(self, action_id: int) -> bool:
+        return self.__held[action_id] == 1
+
+    def was_held(self, action_id: int) -> bool:
+        """
+        if the action was held last tick
+        """
+        return self.__last_held[action_id] == 1
+
+    def was_pressed(self, action_id: int) -> bool:
+        """
+        if the action was started since the last tick
+        """
+        return self.__pressed[action_id] == 1
+
+    def was_released(self, action_id: int) -> bool:
+        """
+        if the action was stopped since the last tick
+        """
+        return self.__released[action_id] == 1
+
+
+# should be the only instance of the class
+Inputs = InputHandler()
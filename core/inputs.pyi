@@ -0,0 +1,30 @@
+"""
+Author:
+Nilusink
+"""
+import pygame as pg
+
+
+MOUSE_ACTIONS: dict[str, int]
+
+
+class InputHandler:
+    __actions: dict[str, int]
+    __key_actions: dict[int, list[int]]
+    __button_actions: dict[int, list[int]]
+    __momentary: list[int]
+    __held: bytearray
+    __last_held: bytearray
+    __pressed: bytearray
+    __released: bytearray
+    def __init__(self) -> None: ...
+    def action(self, name: str) -> int: ...
+    def next_tick(self) -> None: ...
+    def handle_event(self, event: pg.event.Event) -> None: ...
+    def is_held(self, action_id: int) -> bool: ...
+    def was_held(self, action_id: int) -> bool: ...
+    def was_pressed(self, action_id: int) -> bool: ...
+    def was_released(self, action_id: int) -> bool: ...
+
+
+Inputs: InputHandler
@@ -0,0 +1,66 @@
+"""
+Author:
+Nilusink
+
+cache for collision masks
+"""
+from collections import OrderedDict
+import core.config as config
+import pygame as pg
+import typing as tp
+
+
+class MaskCache:
+    """
+    creates collision masks for (rotated) images once and keeps
+    the most recently used ones
+    """
+    __masks: OrderedDict[tuple[tp.Hashable, float], tuple[pg.Surface, pg.mask.Mask]]
+    __max_size: int
+    angle_step: float
+
+    def __init__(self, max_size: int = 512, angle_step: float = 2) -> None:
+        self.__masks = OrderedDict()
+        self.__max_size = max_size
+        self.angle_step = angle_step
+
+    def __len__(self) -> int:
+        return len(self.__masks)
+
+    def quantize(self, angle: float) -> float:
+        """
+        round an angle (in degrees) to the cache resolution
+        """
+        return (round(angle / self.angle_step) * self.angle_step) % 360
+
+    def get(self, image: pg.Surface, angle: float = 0, key: tp.Hashable = None) -> pg.mask.Mask:
+        """
+        get the mask of an image rotated by angle (in degrees)
+
+        :param image: the unrotated source image
+        :param angle: rotation in degrees, gets quantized to `angle_step`
+        :param key: identifies the image, defaults to the surface itself
+        """
+        angle = self.quantize(angle)
+        cache_key = (id(image) if key is None else key, angle)
+
+        entry = self.__masks.get(cache_key)
+        if entry is not None and (key is not None or entry[0] is image):
+            self.__masks.move_to_end(cache_key)
+            return entry[1]
+
+        rotated = pg.transform.rotate(image, angle) if angle else image
+        mask = pg.mask.from_surface(rotated)
+
+        self.__masks[cache_key] = (image, mask)
+        if len(self.__masks) > self.__max_size:
+            self.__masks.popitem(last=False)
+
+        return mask
+
+    def clear(self) -> None:
+        self.__masks.clear()
+
+
+# should be the only instance of the class
+Masks = MaskCache(config.const.MASK_CACHE_SIZE, config.const.ROTATION_STEP)
@@ -0,0 +1,21 @@
+"""
+Author:
+Nilusink
+"""
+from collections import OrderedDict
+import pygame as pg
+import typing as tp
+
+
+class MaskCache:
+    __masks: OrderedDict[tuple[tp.Hashable, float], tuple[pg.Surface, pg.mask.Mask]]
+    __max_size: int
+    angle_step: float
+    def __init__(self, max_size: int = 512, angle_step: float = 2) -> None: ...
+    def __len__(self) -> int: ...
+    def quantize(self, angle: float) -> float: ...
+    def get(self, image: pg.Surface, angle: float = 0, key: tp.Hashable = None) -> pg.mask.Mask: ...
+    def clear(self) -> None: ...
+
+
+Masks: MaskCache
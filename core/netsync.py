@@ -0,0 +1,173 @@
+"""
+Author:
+Nilusink
+
+smoothing of networked players: remote ones are interpolated between
+received states, the local one is predicted and corrected by the server
+"""
+from core.new_types import Vec2
+from collections import deque
+import core.config as config
+import bisect
+import math
+
+
+class SnapshotBuffer:
+    """
+    timestamped states of a remote entity
+
+    sampled `delay` seconds in the past, so there usually are two states
+    to interpolate between. after the newest state it extrapolates with
+    the velocity, at most `max_extrapolation` seconds (e.g. for lost or far
+    updates)
+    """
+    max_snapshots: int = 32
+    delay: float
+    max_extrapolation: float
+    __times: list[float]
+    __states: list[tuple[float, float, float, float]]
+
+    def __init__(
+            self,
+            delay: float = config.const.INTERPOLATION_DELAY,
+            max_extrapolation: float = config.const.MAX_EXTRAPOLATION
+    ) -> None:
+        """
+        :param delay: how far in the past the states are shown (in seconds)
+        :param max_extrapolation: how long to keep moving without new states (in seconds)
+        """
+        self.delay = delay
+        self.max_extrapolation = max_extrapolation
+        self.__times = []
+        self.__states = []
+
+    def __len__(self) -> int:
+        return len(self.__times)
+
+    def push(self, time: float, position: Vec2, velocity: Vec2) -> None:
+        """
+        add a received state
+
+        :param time: when it was received (time.perf_counter)
+        """
+        if self.__times and time - self.__times[-1] > self.delay:
+            # unchanged states aren't sent (see core.snapshots), so the last
+            # one was valid until shortly before this one
+            self.__times.append(time - self.delay)
+            self.__states.append(self.__sample(time - self.delay))
+
+        self.__times.append(time)
+        self.__states.append((position.x, position.y, velocity.x, velocity.y))
+
+        if len(self.__times) > self.max_snapshots:
+            del self.__times[0], self.__states[0]
+
+    def __sample(self, time: float) -> tuple[float, float, float, float]:
+        times, states = self.__times, self.__states
+        i = bisect.bisect_right(times, time)
+
+        if i == 0:
+            return states[0]
+
+        if i == len(times):
+            # newer than everything received
+            x, y, vx, vy = states[-1]
+            delta = min(time - times[-1], self.max_extrapolation) * config.const.T_MULT
+            return x + vx * delta, y + vy * delta, vx, vy
+
+        alpha = (time - times[i - 1]) / (times[i] - times[i - 1])
+        return tuple(a + (b - a) * alpha for a, b in zip(states[i - 1], states[i]))
+
+    def sample(self, time: float) -> tuple[Vec2, Vec2] | None:
+        """
+        the state to show at a time (time.perf_counter)
+
+        :returns: position and velocity, None if nothing was received yet
+        """
+        if not self.__times:
+            return None
+
+        time -= self.delay
+
+        # only the state right before the sampled time is needed from now on
+        i = bisect.bisect_right(self.__times, time)
+        if i > 1:
+            del self.__times[:i - 1], self.__states[:i - 1]
+
+        x, y, vx, vy = self.__sample(time)
+        return Vec2.from_cartesian(x, y), Vec2.from_cartesian(vx, vy)
+
+
+class Reconciler:
+    """
+    the local player moves from its own inputs right away, the server's
+    state of it arrives a round trip later
+
+    that state is compared to the positions sent recently. if it doesn't
+    match any of them, the difference is corrected over `correction_time`
+    (or at once if it is further than `snap_distance`)
+    """
+    history_time: float = 1
+    tolerance: float = 4
+    snap_distance: float = 128
+    correction_time: float = .1
+    __history: deque[tuple[float, float, float]]
+    __error: tuple[float, float]
+
+    def __init__(self) -> None:
+        self.__history = deque()
+        self.__error = (0., 0.)
+
+    @property
+    def error(self) -> Vec2:
+        """
+        the part of the difference that wasn't corrected yet
+        """
+        return Vec2.from_cartesian(*self.__error)
+
+    def record(self, time: float, position: Vec2) -> None:
+        """
+        remember a position that was sent to the server
+        """
+        self.__history.append((time, position.x, position.y))
+        while self.__history[0][0] < time - self.history_time:
+            self.__history.popleft()
+
+    def reconcile(self, position: Vec2) -> None:
+        """
+        compare a position received from the server with the sent ones
+        """
+        if not self.__history:
+            return
+
+        x, y = position.x, position.y
+        _, px, py = min(self.__history, key=lambda entry: (entry[1] - x) ** 2 + (entry[2] - y) ** 2)
+
+        if math.hypot(x - px, y - py) <= self.tolerance:
+            self.__error = (0., 0.)
+
+        else:
+            self.__error = (x - px, y - py)
+
+    def correction(self, frame_time: float) -> Vec2:
+        """
+        :returns: how much to move the local player this frame
+        """
+        ex, ey = self.__error
+        if not ex and not ey:
+            return Vec2()
+
+        part = 1.
+        if math.hypot(ex, ey) <= self.snap_distance:
+            part = 1 - math.exp(-frame_time / self.correction_time)
+
+        dx, dy = ex * part, ey * part
+        self.__error = (ex - dx, ey - dy)
+        if math.hypot(*self.__error) < .01:
+            dx, dy = ex, ey
+            self.__error = (0., 0.)
+
+        # states the server sent before it got the corrected positions match the corrected history
+        self.__history = deque((time, hx + dx, hy + dy) for time, hx, hy in self.__history)
+
+        return Vec2.from_cartesian(dx, dy)
@@ -0,0 +1,34 @@
+"""
+Author:
+Nilusink
+"""
+from core.new_types import Vec2
+from collections import deque
+
+
+class SnapshotBuffer:
+    max_snapshots: int
+    delay: float
+    max_extrapolation: float
+    __times: list[float]
+    __states: list[tuple[float, float, float, float]]
+    def __init__(self, delay: float = ..., max_extrapolation: float = ...) -> None: ...
+    def __len__(self) -> int: ...
+    def push(self, time: float, position: Vec2, velocity: Vec2) -> None: ...
+    def __sample(self, time: float) -> tuple[float, float, float, float]: ...
+    def sample(self, time: float) -> tuple[Vec2, Vec2] | None: ...
+
+
+class Reconciler:
+    history_time: float
+    tolerance: float
+    snap_distance: float
+    correction_time: float
+    __history: deque[tuple[float, float, float]]
+    __error: tuple[float, float]
+    def __init__(self) -> None: ...
+    @property
+    def error(self) -> Vec2: ...
+    def record(self, time: float, position: Vec2) -> None: ...
+    def reconcile(self, position: Vec2) -> None: ...
+    def correction(self, frame_time: float) -> Vec2: ...
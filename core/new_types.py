@@ -3,7 +3,7 @@ Author:
 Nilusink
 """
 import typing as tp
-import numpy as np
+import math
 
 
 # constants
@@ -11,16 +11,23 @@ PI: float = 3.1415926535897932384626433832
 
 
 class Vec2:
+    """
+    2d vector, stored as cartesian coordinates
+
+    angle and length are only calculated when needed and cached
+    until x or y change
+    """
+    __slots__ = ("__x", "__y", "__angle", "__length")
     x: float
     y: float
     angle: float
     length: float
 
-    def __init__(self) -> None:
-        self.__x: float = 0
-        self.__y: float = 0
-        self.__angle: float = 0
-        self.__length: float = 0
+    def __init__(self, x: float = 0, y: float = 0) -> None:
+        self.__x: float = x
+        self.__y: float = y
+        self.__angle: float | None = None
+        self.__length: float | None = None
 
     # variable getters / setters
     @property
@@ -30,7 +37,7 @@ class Vec2:
     @x.setter
     def x(self, value):
         self.__x = value
-        self.__update("c")
+        self.__invalidate()
 
     @property
     def y(self):
@@ -39,7 +46,7 @@ class Vec2:
     @y.setter
     def y(self, value):
         self.__y = value
-        self.__update("c")
+        self.__invalidate()
 
     @property
     def xy(self):
@@ -47,15 +54,17 @@ class Vec2:
 
     @xy.setter
     def xy(self, xy):
-        self.__x = xy[0]
-        self.__y = xy[1]
-        self.__update("c")
+        self.__x, self.__y = xy
+        self.__invalidate()
 
     @property
     def angle(self):
         """
         value in radian
         """
+        if self.__angle is None:
+            self.__angle = math.atan2(self.__y, self.__x)
+
         return self.__angle
 
     @angle.setter
@@ -63,33 +72,29 @@ class Vec2:
         """
         value in radian
         """
-        while value > 2 * PI:
-            value -= 2 * PI
+        if not 0 <= value <= 2 * PI:
+            value %= 2 * PI
 
-        while value < 0:
-            value += 2 * PI
-
-        self.__angle = value
-        self.__update("p")
+        self.__set_polar(value, self.length)
 
     @property
     def length(self):
+        if self.__length is None:
+            self.__length = math.hypot(self.__x, self.__y)
+
         return self.__length
 
     @length.setter
     def length(self, value):
-        self.__length = value
-        self.__update("p")
+        self.__set_polar(self.angle, value)
 
     @property
     def polar(self):
-        return self.__angle, self.__length
+        return self.angle, self.length
 
     @polar.setter
     def polar(self, polar):
-        self.__angle = polar[0]
-        self.__length = polar[1]
-        self.__update("p")
+        self.__set_polar(*polar)
 
     # interaction
     def split_vector(self, direction):
@@ -98,13 +103,16 @@ class Vec2:
         :return: tuple[Vector in only that direction, everything else]
         """
         a = (direction.angle - self.angle)
-        facing = Vec2.from_polar(angle=direction.angle, length=self.length * np.cos(a))
-        other = Vec2.from_polar(angle=direction.angle - PI / 2, length=self.length * np.sin(a))
+        facing = Vec2.from_polar(angle=direction.angle, length=self.length * math.cos(a))
+        other = Vec2.from_polar(angle=direction.angle - PI / 2, length=self.length * math.sin(a))
 
         return facing, other
 
     def copy(self):
-        return Vec2().from_cartesian(x=self.x, y=self.y)
+        out = Vec2(self.__x, self.__y)
+        out.__angle = self.__angle
+        out.__length = self.__length
+        return out
 
     def to_dict(self) -> dict:
         return {
@@ -116,44 +124,96 @@ class Vec2:
 
     # maths
     def __add__(self, other):
-        if issubclass(type(other), Vec2):
-            return Vec2.from_cartesian(x=self.x + other.x, y=self.y + other.y)
+        if isinstance(other, Vec2):
+            return Vec2(self.__x + other.__x, self.__y + other.__y)
 
-        return Vec2.from_cartesian(x=self.x + other, y=self.y + other)
+        return Vec2(self.__x + other, self.__y + other)
 
     def __sub__(self, other):
-        if issubclass(type(other), Vec2):
-            return Vec2.from_cartesian(x=self.x - other.x, y=self.y - other.y)
+        if isinstance(other, Vec2):
+            return Vec2(self.__x - other.__x, self.__y - other.__y)
 
-        return Vec2.from_cartesian(x=self.x - other, y=self.y - other)
+        return Vec2(self.__x - other, self.__y - other)
 
     def __mul__(self, other):
-        if issubclass(type(other), Vec2):
+        if isinstance(other, Vec2):
             return Vec2.from_polar(angle=self.angle + other.angle, length=self.length * other.length)
 
-        return Vec2.from_cartesian(x=self.x * other, y=self.y * other)
+        return Vec2(self.__x * other, self.__y * other)
 
     def __truediv__(self, other):
-        return Vec2.from_cartesian(x=self.x / other, y=self.y / other)
+        return Vec2(self.__x / other, self.__y / other)
+
+    # in-place maths, these modify the vector instead of creating a new one
+    def __iadd__(self, other):
+        if isinstance(other, Vec2):
+            self.__x += other.__x
+            self.__y += other.__y
+
+        else:
+            self.__x += other
+            self.__y += other
+
+        self.__invalidate()
+        return self
+
+    def __isub__(self, other):
+        if isinstance(other, Vec2):
+            self.__x -= other.__x
+            self.__y -= other.__y
+
+        else:
+            self.__x -= other
+            self.__y -= other
+
+        self.__invalidate()
+        return self
+
+    def __imul__(self, other):
+        if isinstance(other, Vec2):
+            self.__set_polar(self.angle + other.angle, self.length * other.length)
+            return self
+
+        self.__x *= other
+        self.__y *= other
+
+        # scaling keeps the angle (for positive factors)
+        if self.__length is not None:
+            self.__length *= abs(other)
+
+        if other <= 0:
+            self.__angle = None
+
+        return self
+
+    def __itruediv__(self, other):
+        self.__x /= other
+        self.__y /= other
+
+        if self.__length is not None:
+            self.__length /= abs(other)
+
+        if other < 0:
+            self.__angle = None
+
+        return self
 
     # internal functions
-    def __update(self, calc_from):
+    def __invalidate(self) -> None:
         """
-        :param calc_from: polar (p) | cartesian (c)
+        forget the cached polar form
         """
-        if calc_from in ("p", "polar"):
-            self.__x = np.cos(self.angle) * self.length
-            self.__y = np.sin(self.angle) * self.length
+        self.__angle = None
+        self.__length = None
 
-        elif calc_from in ("c", "cartesian"):
-            self.__length = np.sqrt(self.x**2 + self.y**2)
-            self.__angle = np.arctan2(self.y, self.x)
-
-        else:
-            raise ValueError("Invalid value for \"calc_from\"")
+    def __set_polar(self, angle, length) -> None:
+        self.__x = math.cos(angle) * length
+        self.__y = math.sin(angle) * length
+        self.__angle = angle
+        self.__length = length
 
     def __abs__(self):
-        return np.sqrt(self.x**2 + self.y**2)
+        return self.length
 
     def __repr__(self):
         return f"<\n" \
@@ -166,15 +226,12 @@ class Vec2:
     # creation of new instances
     @staticmethod
     def from_cartesian(x, y) -> "Vec2":
-        p = Vec2()
-        p.xy = x, y
-
-        return p
+        return Vec2(x, y)
 
     @staticmethod
     def from_polar(angle, length) -> "Vec2":
         p = Vec2()
-        p.polar = angle, length
+        p.__set_polar(angle, length)
 
         return p
 
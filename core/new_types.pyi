@@ -9,15 +9,16 @@ PI: float
 
 
 class Vec2:
+    __slots__: tuple[str, ...]
     x: float
     y: float
     angle: float
     length: float
     __x: float
     __y: float
-    __angle: float
-    __length: float
-    def __init__(self) -> None: ...
+    __angle: float | None
+    __length: float | None
+    def __init__(self, x: float = 0, y: float = 0) -> None: ...
     # setters / getters
     @property
     def x(self) -> float: ...
@@ -52,8 +53,14 @@ class Vec2:
     def __sub__(self, other: tp.Union["Vec2", float]) -> "Vec2": ...
     def __mul__(self, other: tp.Union["Vec2", float]) -> "Vec2": ...
     def __truediv__(self, other: float) -> "Vec2": ...
+    # in-place maths
+    def __iadd__(self, other: tp.Union["Vec2", float]) -> "Vec2": ...
+    def __isub__(self, other: tp.Union["Vec2", float]) -> "Vec2": ...
+    def __imul__(self, other: tp.Union["Vec2", float]) -> "Vec2": ...
+    def __itruediv__(self, other: float) -> "Vec2": ...
     # internal functions
-    def __update(self, calc_from: str) -> None: ...
+    def __invalidate(self) -> None: ...
+    def __set_polar(self, angle: float, length: float) -> None: ...
     def __abs__(self) -> float: ...
     def __repr__(self) -> str: ...
     # static methods.
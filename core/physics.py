@@ -0,0 +1,260 @@
+"""
+Author:
+Nilusink
+
+structure-of-arrays storage for projectile physics
+"""
+from core.spatial import PlatformGrid
+from core.terrain import Terrain
+from core.new_types import Vec2
+import numpy as np
+import typing as tp
+
+
+# flags
+GRAVITY: int = 1
+FRICTION: int = 2
+BOUNCE: int = 4
+
+
+class StoredVec2(Vec2):
+    """
+    a vector read from the store, changes to it are written back through
+    the attribute of the sprite it was read from
+
+    so in-place edits like `bullet.velocity.length *= .5` still change the
+    bullet (written through the attribute and not the slot, slots are reused)
+    """
+    __slots__ = ("__owner", "__attribute")
+
+    def __init__(self, x: float, y: float, owner: tp.Any, attribute: str) -> None:
+        # filled directly, writing back is only needed for later changes
+        set_slot = object.__setattr__
+        set_slot(self, "_Vec2__x", x)
+        set_slot(self, "_Vec2__y", y)
+        set_slot(self, "_Vec2__angle", None)
+        set_slot(self, "_Vec2__length", None)
+        set_slot(self, "_StoredVec2__owner", owner)
+        set_slot(self, "_StoredVec2__attribute", attribute)
+
+    def __setattr__(self, name: str, value: tp.Any) -> None:
+        super().__setattr__(name, value)
+        if name in ("_Vec2__x", "_Vec2__y"):
+            setattr(self.__owner, self.__attribute, self)
+
+
+class PhysicsStore:
+    """
+    keeps positions, velocities, damage and flags of all registered sprites
+    in contiguous arrays, so a whole tick can be integrated in a few passes
+
+    sprites only hold their slot index and read / write through it
+    """
+    __position: np.ndarray
+    __velocity: np.ndarray
+    __previous: np.ndarray
+    __damage: np.ndarray
+    __flags: np.ndarray
+    __alive: np.ndarray
+    __sprites: list[tp.Any]
+    __free: list[int]
+    __top: int
+
+    def __init__(self, capacity: int = 256) -> None:
+        self.__position = np.zeros((capacity, 2), dtype=np.float64)
+        self.__velocity = np.zeros((capacity, 2), dtype=np.float64)
+        self.__previous = np.zeros((capacity, 2), dtype=np.float64)
+        self.__damage = np.zeros(capacity, dtype=np.float64)
+        self.__flags = np.zeros(capacity, dtype=np.uint8)
+        self.__alive = np.zeros(capacity, dtype=bool)
+        self.__sprites = [None] * capacity
+
+        self.__free = []
+        self.__top = 0
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.__alive[:self.__top]))
+
+    @property
+    def capacity(self) -> int:
+        return len(self.__alive)
+
+    # slot management
+    def add(self, sprite: tp.Any, position: Vec2, velocity: Vec2, damage: float = 0) -> int:
+        """
+        register a sprite and return its slot
+        """
+        if self.__free:
+            slot = self.__free.pop()
+
+        else:
+            if self.__top == self.capacity:
+                self.__grow()
+
+            slot = self.__top
+            self.__top += 1
+
+        self.__position[slot] = position.xy
+        self.__previous[slot] = position.xy
+        self.__velocity[slot] = velocity.xy
+        self.__damage[slot] = damage
+        self.__flags[slot] = 0
+        self.__alive[slot] = True
+        self.__sprites[slot] = sprite
+
+        return slot
+
+    def remove(self, slot: int) -> None:
+        """
+        free a slot, so it can be reused by the next sprite
+        """
+        if not self.__alive[slot]:
+            return
+
+        self.__alive[slot] = False
+        self.__flags[slot] = 0
+        self.__sprites[slot] = None
+        self.__free.append(slot)
+
+    def __grow(self) -> None:
+        new_capacity = self.capacity * 2
+
+        def grown(array: np.ndarray) -> np.ndarray:
+            out = np.zeros((new_capacity, *array.shape[1:]), dtype=array.dtype)
+            out[:len(array)] = array
+            return out
+
+        self.__position = grown(self.__position)
+        self.__velocity = grown(self.__velocity)
+        self.__previous = grown(self.__previous)
+        self.__damage = grown(self.__damage)
+        self.__flags = grown(self.__flags)
+        self.__alive = grown(self.__alive)
+        self.__sprites += [None] * (new_capacity - len(self.__sprites))
+
+    # per slot access
+    def get_position(self, slot: int) -> Vec2:
+        x, y = self.__position[slot]
+        return Vec2.from_cartesian(x=float(x), y=float(y))
+
+    def stored_position(self, slot: int, owner: tp.Any) -> StoredVec2:
+        """
+        position that writes in-place changes back through `owner.position`
+        """
+        x, y = self.__position[slot].tolist()
+        return StoredVec2(x, y, owner, "position")
+
+    def set_position(self, slot: int, position: Vec2) -> None:
+        self.__position[slot] = position.xy
+
+    def get_interpolated(self, slot: int, alpha: float) -> tuple[float, float]:
+        """
+        position between the last two steps
+
+        :param alpha: 0 for the previous, 1 for the current position
+        """
+        x0, y0 = self.__previous[slot]
+        x1, y1 = self.__position[slot]
+        return float(x0 + (x1 - x0) * alpha), float(y0 + (y1 - y0) * alpha)
+
+    def get_velocity(self, slot: int) -> Vec2:
+        x, y = self.__velocity[slot]
+        return Vec2.from_cartesian(x=float(x), y=float(y))
+
+    def stored_velocity(self, slot: int, owner: tp.Any) -> StoredVec2:
+        """
+        velocity that writes in-place changes back through `owner.velocity`
+        """
+        x, y = self.__velocity[slot].tolist()
+        return StoredVec2(x, y, owner, "velocity")
+
+    def set_velocity(self, slot: int, velocity: Vec2) -> None:
+        self.__velocity[slot] = velocity.xy
+
+    def get_damage(self, slot: int) -> float:
+        return float(self.__damage[slot])
+
+    def set_damage(self, slot: int, damage: float) -> None:
+        self.__damage[slot] = damage
+
+    def set_flag(self, slot: int, flag: int, value: bool) -> None:
+        if value:
+            self.__flags[slot] |= flag
+
+        else:
+            self.__flags[slot] &= ~np.uint8(flag)
+
+    def has_flag(self, slot: int, flag: int) -> bool:
+        return bool(self.__flags[slot] & flag)
+
+    # simulation
+    def step(
+            self,
+            delta: float,
+            gravity: float,
+            bounds: tuple[float, float],
+            platforms: PlatformGrid | Terrain,
+            margin: float = 200
+    ) -> list[tp.Any]:
+        """
+        apply gravity, friction, wall bounce and movement to every slot
+
+        :param delta: already scaled time delta
+        :param gravity: gravitational acceleration
+        :param bounds: (width, height) of the world
+        :param platforms: the platforms (or terrain) of the world
+        :param margin: how far outside the bounds a sprite may fly
+        :returns: the sprites that left the world or hit the floor
+        """
+        top = self.__top
+        alive = self.__alive[:top]
+        if not alive.any():
+            return []
+
+        position = self.__position[:top]
+        velocity = self.__velocity[:top]
+        flags = self.__flags[:top]
+
+        # for interpolating between steps
+        self.__previous[:top] = position
+
+        # gravity
+        affected = alive & (flags & GRAVITY).astype(bool)
+        velocity[affected, 1] += gravity * delta
+
+        # friction
+        affected = alive & (flags & FRICTION).astype(bool)
+        velocity[affected] *= 1 - delta * 0.01
+
+        # wall bounce
+        affected = alive & (flags & BOUNCE).astype(bool)
+        for axis, limit in enumerate(bounds):
+            low = affected & (position[:, axis] < 0)
+            high = affected & (position[:, axis] > limit)
+            velocity[low, axis] = np.abs(velocity[low, axis])
+            velocity[high, axis] = -np.abs(velocity[high, axis])
+
+        # movement
+        position[alive] += velocity[alive] * delta
+
+        # culling
+        outside = np.ones(top, dtype=bool)
+        for axis, limit in enumerate(bounds):
+            outside &= ~((-margin < position[:, axis]) & (position[:, axis] < limit + margin))
+
+        on_floor = np.zeros(top, dtype=bool)
+        if not platforms.empty:
+            # sweep the movement of this step, so fast sprites can't skip thin platforms
+            start = self.__previous[:top]
+            entry = platforms.segment_entry(start, position)
+            on_floor = alive & (entry <= 1)
+
+            # move the hits back to where they entered the platform
+            position[on_floor] = start[on_floor] + (position[on_floor] - start[on_floor]) * entry[on_floor, np.newaxis]
+
+        dying = np.flatnonzero(alive & (outside | on_floor))
+        return [self.__sprites[slot] for slot in dying]
+
+
+# should be the only instance of the class
+Projectiles = PhysicsStore()
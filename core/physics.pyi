@@ -0,0 +1,65 @@
+"""
+Author:
+Nilusink
+"""
+from core.spatial import PlatformGrid
+from core.terrain import Terrain
+from core.new_types import Vec2
+import numpy as np
+import typing as tp
+
+
+GRAVITY: int
+FRICTION: int
+BOUNCE: int
+
+
+class StoredVec2(Vec2):
+    __owner: tp.Any
+    __attribute: str
+    def __init__(self, x: float, y: float, owner: tp.Any, attribute: str) -> None: ...
+    def __setattr__(self, name: str, value: tp.Any) -> None: ...
+
+
+class PhysicsStore:
+    __position: np.ndarray
+    __velocity: np.ndarray
+    __previous: np.ndarray
+    __damage: np.ndarray
+    __flags: np.ndarray
+    __alive: np.ndarray
+    __sprites: list[tp.Any]
+    __free: list[int]
+    __top: int
+    def __init__(self, capacity: int = 256) -> None: ...
+    def __len__(self) -> int: ...
+    @property
+    def capacity(self) -> int: ...
+    # slot management
+    def add(self, sprite: tp.Any, position: Vec2, velocity: Vec2, damage: float = 0) -> int: ...
+    def remove(self, slot: int) -> None: ...
+    def __grow(self) -> None: ...
+    # per slot access
+    def get_position(self, slot: int) -> Vec2: ...
+    def stored_position(self, slot: int, owner: tp.Any) -> StoredVec2: ...
+    def set_position(self, slot: int, position: Vec2) -> None: ...
+    def get_interpolated(self, slot: int, alpha: float) -> tuple[float, float]: ...
+    def get_velocity(self, slot: int) -> Vec2: ...
+    def stored_velocity(self, slot: int, owner: tp.Any) -> StoredVec2: ...
+    def set_velocity(self, slot: int, velocity: Vec2) -> None: ...
+    def get_damage(self, slot: int) -> float: ...
+    def set_damage(self, slot: int, damage: float) -> None: ...
+    def set_flag(self, slot: int, flag: int, value: bool) -> None: ...
+    def has_flag(self, slot: int, flag: int) -> bool: ...
+    # simulation
+    def step(
+            self,
+            delta: float,
+            gravity: float,
+            bounds: tuple[float, float],
+            platforms: PlatformGrid | Terrain,
+            margin: float = 200
+    ) -> list[tp.Any]: ...
+
+
+Projectiles: PhysicsStore
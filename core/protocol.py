@@ -0,0 +1,303 @@
+"""
+Author:
+Nilusink
+
+wire format of the packets sent between clients and the server
+
+version 1: json between \x01 and \x04 markers
+version 2: length-prefixed frames, player updates are packed binary,
+    everything else is still sent as json
+version 3: player updates only contain the fields that changed (see core.snapshots)
+"""
+import struct
+import json
+
+
+PROTOCOL_VERSION: int = 3
+LEGACY_VERSION: int = 1
+# first version that understands delta frames
+DELTA_VERSION: int = 3
+
+# sent by the client after connecting and answered by the server,
+# followed by one version byte (without version 1 markers, so old servers ignore it)
+HELLO_MAGIC: bytes = b"GPv"
+HELLO_SIZE: int = len(HELLO_MAGIC) + 1
+
+# version 1 markers
+START_MARKER: bytes = b"\x01"
+END_MARKER: bytes = b"\x04"
+
+# frame kinds
+JSON_FRAME: int = 0
+PLAYER_FRAME: int = 1
+DELTA_FRAME: int = 2
+
+# event types (same as in core.game)
+SHOT: int = 0
+BULLET_UPDATE: int = 1
+
+# payload length, frame kind
+FRAME_HEADER = struct.Struct("!IB")
+MAX_FRAME_SIZE: int = 1 << 20
+
+# hp, position x / y, velocity x / y, event count
+PLAYER = struct.Struct("!5fH")
+# delta fields, in the order of their bits in the mask (followed by the event count)
+DELTA_FIELDS: tuple[tuple[str, str | None], ...] = (
+    ("hp", None),
+    ("pos", "x"),
+    ("pos", "y"),
+    ("vel", "x"),
+    ("vel", "y"),
+)
+FIELD = struct.Struct("!f")
+EVENT_COUNT = struct.Struct("!H")
+# angle, position x / y, bullet id
+SHOT_EVENT = struct.Struct("!3fI")
+# position x / y, velocity x / y, damage, bullet id
+BULLET_UPDATE_EVENT = struct.Struct("!5fI")
+
+
+class ProtocolError(ValueError):
+    ...
+
+
+def hello(version: int = PROTOCOL_VERSION) -> bytes:
+    return HELLO_MAGIC + bytes([version])
+
+
+def parse_hello(data: bytes) -> int | None:
+    """
+    :returns: the version in a hello, None if data isn't a hello
+    """
+    if len(data) != HELLO_SIZE or not data.startswith(HELLO_MAGIC):
+        return None
+
+    return data[-1]
+
+
+def _pack_string(text: str) -> bytes:
+    encoded = text.encode("utf-8")
+    if len(encoded) > 255:
+        raise ValueError(f"string too long: \"{text}\"")
+
+    return bytes([len(encoded)]) + encoded
+
+
+def _unpack_string(data: memoryview | bytes, offset: int) -> tuple[str, int]:
+    length = data[offset]
+    offset += 1
+    return bytes(data[offset:offset + length]).decode("utf-8"), offset + length
+
+
+def _pack_events(events: list[dict], out: list[bytes]) -> None:
+    for event in events:
+        match event["type"]:
+            case 0:     # SHOT
+                out.append(bytes([SHOT]))
+                out.append(_pack_string(event["weapon"]))
+                out.append(SHOT_EVENT.pack(event["angle"], event["pos"]["x"], event["pos"]["y"], event["id"]))
+
+            case 1:     # BULLET_UPDATE
+                out.append(bytes([BULLET_UPDATE]))
+                out.append(BULLET_UPDATE_EVENT.pack(
+                    event["position"]["x"],
+                    event["position"]["y"],
+                    event["velocity"]["x"],
+                    event["velocity"]["y"],
+                    event["damage"],
+                    event["id"],
+                ))
+
+            case _:
+                raise ValueError(f"can't pack event type {event['type']}")
+
+
+def _unpack_events(data: memoryview | bytes, offset: int, count: int) -> list[dict]:
+    events = []
+    for _ in range(count):
+        event_type = data[offset]
+        offset += 1
+
+        match event_type:
+            case 0:     # SHOT
+                weapon, offset = _unpack_string(data, offset)
+                angle, px, py, bullet_id = SHOT_EVENT.unpack_from(data, offset)
+                offset += SHOT_EVENT.size
+                events.append({
+                    "type": SHOT,
+                    "weapon": weapon,
+                    "angle": angle,
+                    "pos": {
+                        "x": px,
+                        "y": py,
+                    },
+                    "id": bullet_id
+                })
+
+            case 1:     # BULLET_UPDATE
+                px, py, pvx, pvy, damage, bullet_id = BULLET_UPDATE_EVENT.unpack_from(data, offset)
+                offset += BULLET_UPDATE_EVENT.size
+                events.append({
+                    "type": BULLET_UPDATE,
+                    "position": {
+                        "x": px,
+                        "y": py,
+                    },
+                    "velocity": {
+                        "x": pvx,
+                        "y": pvy,
+                    },
+                    "damage": damage,
+                    "id": bullet_id
+                })
+
+            case _:
+                raise ProtocolError(f"invalid event type {event_type}")
+
+    return events
+
+
+def pack_player(packet: dict) -> bytes:
+    """
+    pack a player update (see `Connection.send_update`)
+
+    :raises: KeyError, TypeError, ValueError or struct.error if the packet
+        doesn't have the fixed shape
+    """
+    events = packet["events"]
+    out = [
+        _pack_string(packet["name"]),
+        PLAYER.pack(
+            packet["hp"],
+            packet["pos"]["x"],
+            packet["pos"]["y"],
+            packet["vel"]["x"],
+            packet["vel"]["y"],
+            len(events),
+        )
+    ]
+    _pack_events(events, out)
+
+    return b"".join(out)
+
+
+def unpack_player(data: memoryview | bytes) -> dict:
+    """
+    the inverse of `pack_player`
+    """
+    name, offset = _unpack_string(data, 0)
+    hp, x, y, vx, vy, count = PLAYER.unpack_from(data, offset)
+    offset += PLAYER.size
+
+    events = _unpack_events(data, offset, count)
+
+    return {
+        "name": name,
+        "hp": hp,
+        "pos": {
+            "x": x,
+            "y": y,
+        },
+        "vel": {
+            "x": vx,
+            "y": vy,
+        },
+        "events": events
+    }
+
+
+def pack_delta(packet: dict) -> bytes:
+    """
+    pack a player update that may be missing some of the state fields
+    (everything but name and events is optional)
+
+    :raises: KeyError, TypeError, ValueError or struct.error if the packet
+        doesn't have the shape of a player update
+    """
+    if not packet.keys() <= {"name", "hp", "pos", "vel", "events"}:
+        raise ValueError("not a player update")
+
+    mask = 0
+    fields = []
+    for bit, (key, sub_key) in enumerate(DELTA_FIELDS):
+        value = packet.get(key)
+        if value is not None and sub_key is not None:
+            value = value.get(sub_key)
+
+        if value is not None:
+            mask |= 1 << bit
+            fields.append(FIELD.pack(value))
+
+    events = packet["events"]
+    out = [_pack_string(packet["name"]), bytes([mask]), *fields, EVENT_COUNT.pack(len(events))]
+    _pack_events(events, out)
+
+    return b"".join(out)
+
+
+def unpack_delta(data: memoryview | bytes) -> dict:
+    """
+    the inverse of `pack_delta`
+    """
+    name, offset = _unpack_string(data, 0)
+    mask = data[offset]
+    offset += 1
+
+    packet: dict = {"name": name}
+    for bit, (key, sub_key) in enumerate(DELTA_FIELDS):
+        if mask & (1 << bit):
+            value, = FIELD.unpack_from(data, offset)
+            offset += FIELD.size
+
+            if sub_key is None:
+                packet[key] = value
+
+            else:
+                packet.setdefault(key, {})[sub_key] = value
+
+    count, = EVENT_COUNT.unpack_from(data, offset)
+    packet["events"] = _unpack_events(data, offset + EVENT_COUNT.size, count)
+
+    return packet
+
+
+def encode(packet: dict, version: int = PROTOCOL_VERSION) -> bytes:
+    """
+    encode a packet, including its framing
+    """
+    if version == LEGACY_VERSION:
+        return START_MARKER + json.dumps(packet).encode("ASCII") + END_MARKER
+
+    try:
+        if version >= DELTA_VERSION:
+            kind, payload = DELTA_FRAME, pack_delta(packet)
+
+        else:
+            kind, payload = PLAYER_FRAME, pack_player(packet)
+
+    except (KeyError, TypeError, ValueError, struct.error):
+        kind, payload = JSON_FRAME, json.dumps(packet).encode("utf-8")
+
+    return FRAME_HEADER.pack(len(payload), kind) + payload
+
+
+def decode(kind: int, payload: memoryview | bytes) -> dict:
+    """
+    decode the payload of a version 2 frame
+    """
+    try:
+        match kind:
+            case 0:     # JSON_FRAME
+                return json.loads(bytes(payload))
+
+            case 1:     # PLAYER_FRAME
+                return unpack_player(payload)
+
+            case 2:     # DELTA_FRAME
+                return unpack_delta(payload)
+
+    except (ValueError, IndexError, struct.error) as error:
+        raise ProtocolError(f"invalid frame: {error}") from None
+
+    raise ProtocolError(f"invalid frame kind {kind}")
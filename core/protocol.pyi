@@ -0,0 +1,45 @@
+"""
+Author:
+Nilusink
+"""
+import struct
+
+
+PROTOCOL_VERSION: int
+LEGACY_VERSION: int
+DELTA_VERSION: int
+HELLO_MAGIC: bytes
+HELLO_SIZE: int
+START_MARKER: bytes
+END_MARKER: bytes
+JSON_FRAME: int
+PLAYER_FRAME: int
+DELTA_FRAME: int
+SHOT: int
+BULLET_UPDATE: int
+FRAME_HEADER: struct.Struct
+MAX_FRAME_SIZE: int
+PLAYER: struct.Struct
+DELTA_FIELDS: tuple[tuple[str, str | None], ...]
+FIELD: struct.Struct
+EVENT_COUNT: struct.Struct
+SHOT_EVENT: struct.Struct
+BULLET_UPDATE_EVENT: struct.Struct
+
+
+class ProtocolError(ValueError):
+    ...
+
+
+def hello(version: int = ...) -> bytes: ...
+def parse_hello(data: bytes) -> int | None: ...
+def _pack_string(text: str) -> bytes: ...
+def _unpack_string(data: memoryview | bytes, offset: int) -> tuple[str, int]: ...
+def _pack_events(events: list[dict], out: list[bytes]) -> None: ...
+def _unpack_events(data: memoryview | bytes, offset: int, count: int) -> list[dict]: ...
+def pack_player(packet: dict) -> bytes: ...
+def unpack_player(data: memoryview | bytes) -> dict: ...
+def pack_delta(packet: dict) -> bytes: ...
+def unpack_delta(data: memoryview | bytes) -> dict: ...
+def encode(packet: dict, version: int = ...) -> bytes: ...
+def decode(kind: int, payload: memoryview | bytes) -> dict: ...
@@ -0,0 +1,66 @@
+"""
+Author:
+Nilusink
+
+lookup of networked entities by player name and network id
+"""
+import pygame as pg
+import typing as tp
+
+
+class EntityRegistry:
+    """
+    maps player names and network ids to sprites in constant time
+
+    filled by the groups themselves when sprites are added or removed
+    (see `_Players` and `_NetworkUpdated`), so killed sprites disappear
+    from it automatically. network ids are only unique per client, so
+    networked sprites are registered under the name of their owner too
+    """
+    __next_id: int
+    __players: dict[str, pg.sprite.Sprite]
+    __networked: dict[tuple[str, int], pg.sprite.Sprite]
+
+    def __init__(self) -> None:
+        self.__next_id = 0
+        self.__players = {}
+        self.__networked = {}
+
+    def new_id(self) -> int:
+        """
+        a network id, sequential so no two entities of this client share one
+
+        wraps around after 2^32 (the size in the protocol)
+        """
+        entity_id = self.__next_id
+        self.__next_id = (self.__next_id + 1) & 0xFFFFFFFF
+        return entity_id
+
+    @staticmethod
+    def owner_of(sprite: tp.Any) -> str:
+        return getattr(getattr(sprite, "parent", None), "name", "")
+
+    def add_player(self, sprite: tp.Any) -> None:
+        self.__players[sprite.name] = sprite
+
+    def remove_player(self, sprite: tp.Any) -> None:
+        if self.__players.get(sprite.name) is sprite:
+            del self.__players[sprite.name]
+
+    def player(self, name: str) -> pg.sprite.Sprite | None:
+        return self.__players.get(name)
+
+    def add_networked(self, sprite: tp.Any) -> None:
+        self.__networked[(self.owner_of(sprite), sprite.id)] = sprite
+
+    def remove_networked(self, sprite: tp.Any) -> None:
+        key = (self.owner_of(sprite), sprite.id)
+        if self.__networked.get(key) is sprite:
+            del self.__networked[key]
+
+    def networked(self, owner: str, entity_id: int) -> pg.sprite.Sprite | None:
+        return self.__networked.get((owner, entity_id))
+
+
+# should be the only instance of the class
+Entities = EntityRegistry()
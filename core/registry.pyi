@@ -0,0 +1,25 @@
+"""
+Author:
+Nilusink
+"""
+import pygame as pg
+import typing as tp
+
+
+class EntityRegistry:
+    __next_id: int
+    __players: dict[str, pg.sprite.Sprite]
+    __networked: dict[tuple[str, int], pg.sprite.Sprite]
+    def __init__(self) -> None: ...
+    def new_id(self) -> int: ...
+    @staticmethod
+    def owner_of(sprite: tp.Any) -> str: ...
+    def add_player(self, sprite: tp.Any) -> None: ...
+    def remove_player(self, sprite: tp.Any) -> None: ...
+    def player(self, name: str) -> pg.sprite.Sprite | None: ...
+    def add_networked(self, sprite: tp.Any) -> None: ...
+    def remove_networked(self, sprite: tp.Any) -> None: ...
+    def networked(self, owner: str, entity_id: int) -> pg.sprite.Sprite | None: ...
+
+
+Entities: EntityRegistry
@@ -1,7 +1,12 @@
+from core.snapshots import SnapshotEncoder, SnapshotDecoder
+from core.protocol import DELTA_VERSION
 from core.gamesocket import GameSocket
+from core.netsync import Reconciler
+from queue import SimpleQueue, Empty
 from threading import Thread
 from core.game import *
-import socket, json
+import socket
+import time
 
 
 def print_traceback(func: tp.Callable) -> tp.Callable:
@@ -16,15 +21,35 @@ def print_traceback(func: tp.Callable) -> tp.Callable:
     return wrapper
 
 
+# weapons a shot event may name (never eval what a peer sent)
+WEAPONS: dict[str, tp.Type[Bullet]] = {
+    "AK47": AK47,
+    "Sniper": Sniper,
+    "Rocket": Rocket,
+    "HomingRocket": HomingRocket,
+}
+
+
 class Connection(GameSocket):
     running: bool = True
     __server_address: tuple[str, int]
+    __snapshots_out: SnapshotEncoder
+    __snapshots_in: SnapshotDecoder
+    __received: SimpleQueue
+    __reconciler: Reconciler
+    __last_apply: float
 
     def __init__(self, server_address: tuple[str, int]) -> None:
         super().__init__(socket.AF_INET, socket.SOCK_STREAM)
         self.connect(server_address)
+        self.negotiate()
 
         self.__server_address = server_address
+        self.__snapshots_out = SnapshotEncoder()
+        self.__snapshots_in = SnapshotDecoder()
+        self.__received = SimpleQueue()
+        self.__reconciler = Reconciler()
+        self.__last_apply = time.perf_counter()
 
         Thread(target=self.receive_player_data).start()
 
@@ -36,25 +61,67 @@ class Connection(GameSocket):
         self.settimeout(.2)
         while self.running:
             try:
-                data = self.recv_packet()
+                data = self.__snapshots_in.decode(self.recv_packet())
+                if data is None:
+                    # wait for the keyframe
+                    continue
 
-                selected_player: Player = ...
-                for player in Players.sprites():
-                    if player.name == data["name"]:
-                        selected_player = player
-                        break
+                # sprites are only changed by the main loop (see apply_updates)
+                self.__received.put((time.perf_counter(), data))
 
-                if selected_player is ...:
-                    print(f"created new player")
-                    selected_player = Player(spawn_point=Vec2(), name=data["name"])
-                    print(f"created new player, name: {selected_player.name}")
+            except TimeoutError:
+                continue
 
-                self.update_player(selected_player, data)
+    def apply_updates(self, local_player: Player) -> None:
+        """
+        apply everything received since the last call, call once per frame before `Game.update`
 
-            except TimeoutError:
+        remote players get the states as timestamped snapshots and are drawn
+        slightly in the past (see `SnapshotBuffer`), the local player is only
+        corrected if the server disagrees with where it was predicted
+        """
+        now = time.perf_counter()
+
+        while True:
+            try:
+                received, data = self.__received.get_nowait()
+
+            except Empty:
+                break
+
+            if data["name"] == local_player.name:
+                # the server decides about hp (and so about death)
+                local_player.set_hp(data["hp"])
+                self.__reconciler.reconcile(Vec2.from_dict(data["pos"]))
                 continue
 
+            selected_player: Player | None = Players.get_by_name(data["name"])
+            if selected_player is None:
+                if data["hp"] <= 0:
+                    # dead, created again once it respawned
+                    continue
+
+                selected_player = Player(spawn_point=Vec2.from_dict(data["pos"]), name=data["name"], networked=True)
+                print(f"created new player, name: {selected_player.name}")
+
+            if selected_player.snapshots is None:
+                self.update_player(selected_player, data)
+                continue
+
+            selected_player.set_hp(data["hp"])
+            selected_player.snapshots.push(received, Vec2.from_dict(data["pos"]), Vec2.from_dict(data["vel"]))
+            self.apply_events(selected_player, data["events"])
+
+        frame_time, self.__last_apply = now - self.__last_apply, now
+        local_player.position += self.__reconciler.correction(frame_time)
+
     def send_update(self, player: Player) -> None:
+        """
+        queue the state and events of the local player, everything queued
+        during a frame is sent together by `flush` (call once per frame)
+        """
+        self.__reconciler.record(time.perf_counter(), player.position)
+
         msg = {
             "name": player.name,
             "hp": player.hp,
@@ -73,22 +140,34 @@ class Connection(GameSocket):
             events = [event.to_dict() for event in bullet.events]
             msg["events"] += events
 
-        print(f"sending {len(json.dumps(msg))}")
+        if self.protocol_version >= DELTA_VERSION:
+            # only what changed
+            msg = self.__snapshots_out.encode(msg)
+            if msg is None:
+                return
 
-        self.send_packet(msg)
+        self.queue_packet(msg)
 
     @staticmethod
     @print_traceback
     def update_player(player: Player, update_from: dict) -> None:
         player.position = Vec2.from_cartesian(update_from["pos"]["x"], update_from["pos"]["y"])
         player.velocity = Vec2.from_cartesian(update_from["vel"]["x"], update_from["vel"]["y"])
-        player.hp = update_from["hp"]
+        player.set_hp(update_from["hp"])
 
-        # handle events
-        for event in update_from["events"]:
+        Connection.apply_events(player, update_from["events"])
+
+    @staticmethod
+    @print_traceback
+    def apply_events(player: Player, events: list[dict]) -> None:
+        for event in events:
             match event["type"]:
                 case 0:
-                    weapon: tp.Type[Bullet] = eval(event["weapon"])
+                    weapon = WEAPONS.get(event["weapon"])
+                    if weapon is None:
+                        print(f"shot with unknown weapon: {event['weapon']!r}")
+                        continue
+
                     direction = Vec2.from_polar(angle=event["angle"], length=1)
                     pos = Vec2.from_cartesian(event["pos"]["x"], event["pos"]["y"])
                     b = weapon(
@@ -101,10 +180,10 @@ class Connection(GameSocket):
                     b.remove(UpdatesToNetwork)
 
                 case 1:
-                    bullet = NetworkUpdated.get_by_id(event["id"])
+                    bullet = NetworkUpdated.get_by_id(event["id"], player.name)
                     if bullet:
                         bullet: tp.Type[Bullet]
-                        bullet._position = Vec2.from_dict(event["position"])
+                        bullet.position = Vec2.from_dict(event["position"])
                         bullet.velocity = Vec2.from_dict(event["velocity"])
                         bullet.damage = event["damage"]
                         continue
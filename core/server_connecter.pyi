@@ -1,15 +1,30 @@
+from core.snapshots import SnapshotEncoder, SnapshotDecoder
 from core.gamesocket import GameSocket
-from core.game import Player
+from core.netsync import Reconciler
+from queue import SimpleQueue
+from core.game import Player, Bullet
+import typing as tp
+
+
+WEAPONS: dict[str, tp.Type[Bullet]]
 
 
 class Connection(GameSocket):
     running: bool
     __server_address: tuple[str, int]
+    __snapshots_out: SnapshotEncoder
+    __snapshots_in: SnapshotDecoder
+    __received: SimpleQueue
+    __reconciler: Reconciler
+    __last_apply: float
 
     def __init__(self, server_address: tuple[str, int]) -> None: ...
     @property
     def server_address(self) -> tuple[str, int]: ...
     def receive_player_data(self) -> None: ...
+    def apply_updates(self, local_player: Player) -> None: ...
     def send_update(self, player: Player) -> None: ...
     @staticmethod
     def update_player(player: Player, update_from: dict) -> None: ...
+    @staticmethod
+    def apply_events(player: Player, events: list[dict]) -> None: ...
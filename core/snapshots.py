@@ -0,0 +1,133 @@
+"""
+Author:
+Nilusink
+
+delta encoding of player updates
+
+both sides remember the last state of every player, an update only
+contains the fields that changed by more than their step, plus a full
+keyframe every now and then (TCP doesn't lose anything, but the server may
+drop outdated updates for slow clients)
+"""
+from core.protocol import DELTA_FIELDS
+
+
+def merge(old: dict, new: dict) -> dict:
+    """
+    apply the (partial) update new on top of old, events of both are kept
+    """
+    merged = {**old, **new}
+    for key in ("pos", "vel"):
+        if key in old and key in new:
+            merged[key] = {**old[key], **new[key]}
+
+    if "events" in old and "events" in new:
+        merged["events"] = old["events"] + new["events"]
+
+    return merged
+
+
+def is_complete(packet: dict) -> bool:
+    """
+    check if an update contains every state field (a keyframe)
+    """
+    for key, sub_key in DELTA_FIELDS:
+        if key not in packet or (sub_key is not None and sub_key not in packet[key]):
+            return False
+
+    return True
+
+
+class SnapshotEncoder:
+    """
+    sending side, remembers the last sent value of every field
+
+    a field is only sent again once it changed by more than its step, so
+    sub-pixel jitter doesn't cause traffic. updates without changes and
+    events aren't sent at all
+    """
+    keyframe_interval: int = 60
+    steps: dict[str, float] = {
+        "hp": 0,
+        "pos": .5,
+        "vel": .5,
+    }
+    __sent: dict[str, dict[tuple[str, str | None], float]]
+    __updates: dict[str, int]
+
+    def __init__(self) -> None:
+        self.__sent = {}
+        self.__updates = {}
+
+    def encode(self, packet: dict) -> dict | None:
+        """
+        :param packet: a full player update
+        :returns: the fields that have to be sent (always with name and
+            events), None if there is nothing to send
+        """
+        name = packet["name"]
+        updates = self.__updates.get(name, 0)
+
+        if name not in self.__sent or updates >= self.keyframe_interval:
+            # keyframe, everything is sent again
+            self.__sent[name] = {}
+            updates = 0
+
+        sent = self.__sent[name]
+        self.__updates[name] = updates + 1
+
+        delta = {"name": name}
+        for field in DELTA_FIELDS:
+            key, sub_key = field
+            value = packet[key] if sub_key is None else packet[key][sub_key]
+
+            if field in sent and abs(value - sent[field]) <= self.steps[key]:
+                continue
+
+            sent[field] = value
+            if sub_key is None:
+                delta[key] = value
+
+            else:
+                delta.setdefault(key, {})[sub_key] = value
+
+        if len(delta) == 1 and not packet["events"]:
+            return None
+
+        delta["events"] = packet["events"]
+        return delta
+
+    def forget(self, name: str) -> None:
+        """
+        drop what was sent of a player that left
+        """
+        self.__sent.pop(name, None)
+        self.__updates.pop(name, None)
+
+
+class SnapshotDecoder:
+    """
+    receiving side, completes updates with the last known state
+    """
+    __known: dict[str, dict]
+
+    def __init__(self) -> None:
+        self.__known = {}
+
+    def decode(self, packet: dict) -> dict | None:
+        """
+        :param packet: a (partial) player update
+        :returns: the full update, None if the first update of a player
+            wasn't a keyframe
+        """
+        name = packet["name"]
+        state = {key: value for key, value in packet.items() if key != "events"}
+
+        if name in self.__known:
+            state = merge(self.__known[name], state)
+
+        elif not is_complete(state):
+            return None
+
+        self.__known[name] = state
+        return {**state, "events": packet["events"]}
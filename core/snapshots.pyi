@@ -0,0 +1,24 @@
+"""
+Author:
+Nilusink
+"""
+
+
+def merge(old: dict, new: dict) -> dict: ...
+def is_complete(packet: dict) -> bool: ...
+
+
+class SnapshotEncoder:
+    keyframe_interval: int
+    steps: dict[str, float]
+    __sent: dict[str, dict[tuple[str, str | None], float]]
+    __updates: dict[str, int]
+    def __init__(self) -> None: ...
+    def encode(self, packet: dict) -> dict | None: ...
+    def forget(self, name: str) -> None: ...
+
+
+class SnapshotDecoder:
+    __known: dict[str, dict]
+    def __init__(self) -> None: ...
+    def decode(self, packet: dict) -> dict | None: ...
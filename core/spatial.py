@@ -0,0 +1,368 @@
+"""
+Author:
+Nilusink
+
+spatial acceleration structures
+"""
+import pygame as pg
+import numpy as np
+import typing as tp
+
+
+class SpatialHash:
+    """
+    uniform grid mapping cells to the items overlapping them
+
+    items must have a `rect` attribute (e.g. sprites), the cells
+    an item occupies are calculated when it is inserted
+    """
+    __cell_size: int
+    __cells: dict[tuple[int, int], list[tp.Any]]
+
+    def __init__(self, cell_size: int = 128) -> None:
+        self.__cell_size = cell_size
+        self.__cells = {}
+
+    @property
+    def cell_size(self) -> int:
+        return self.__cell_size
+
+    def __keys(self, rect: pg.Rect) -> tp.Iterator[tuple[int, int]]:
+        """
+        all cells touched by a rect
+        """
+        size = self.__cell_size
+        for cx in range(rect.left // size, max(rect.left, rect.right - 1) // size + 1):
+            for cy in range(rect.top // size, max(rect.top, rect.bottom - 1) // size + 1):
+                yield cx, cy
+
+    def clear(self) -> None:
+        self.__cells.clear()
+
+    def insert(self, item: tp.Any) -> None:
+        for key in self.__keys(item.rect):
+            self.__cells.setdefault(key, []).append(item)
+
+    def rebuild(self, items: tp.Iterable[tp.Any]) -> None:
+        """
+        clear the grid and insert all items again
+        """
+        self.clear()
+        for item in items:
+            self.insert(item)
+
+    def query(self, rect: pg.Rect) -> list[tp.Any]:
+        """
+        all items in the cells touched by rect (no exact overlap test)
+        """
+        found: dict[int, tp.Any] = {}
+        for key in self.__keys(rect):
+            for item in self.__cells.get(key, ()):
+                found[id(item)] = item
+
+        return list(found.values())
+
+    def pairs(self) -> tp.Iterator[tuple[tp.Any, tp.Any]]:
+        """
+        every pair of items with overlapping rects, each pair only once
+        """
+        seen: set[tuple[int, int]] = set()
+        for members in self.__cells.values():
+            for i, item in enumerate(members):
+                for other in members[i + 1:]:
+                    if item is other:
+                        continue
+
+                    key = (id(item), id(other)) if id(item) < id(other) else (id(other), id(item))
+                    if key in seen:
+                        continue
+
+                    seen.add(key)
+                    if item.rect.colliderect(other.rect):
+                        yield item, other
+
+
+class InterestGrid:
+    """
+    uniform grid of points (e.g. player positions) that move often
+
+    every key is in exactly one cell, moving it only touches the grid if
+    the cell changed. two keys are near each other if their cells are at
+    most one apart, so with the cell size set to a radius everything
+    inside the radius is near (and some things up to twice as far)
+    """
+    __cell_size: float
+    __cell_of: dict[tp.Hashable, tuple[int, int]]
+    __cells: dict[tuple[int, int], set[tp.Hashable]]
+
+    def __init__(self, cell_size: float = 1920) -> None:
+        self.__cell_size = cell_size
+        self.__cell_of = {}
+        self.__cells = {}
+
+    def __len__(self) -> int:
+        return len(self.__cell_of)
+
+    @property
+    def cell_size(self) -> float:
+        return self.__cell_size
+
+    def cell_of(self, key: tp.Hashable) -> tuple[int, int] | None:
+        return self.__cell_of.get(key)
+
+    def move(self, key: tp.Hashable, x: float, y: float) -> bool:
+        """
+        set the position of a key (adds it if it isn't in the grid yet)
+
+        :returns: True if the key changed its cell
+        """
+        cell = int(x // self.__cell_size), int(y // self.__cell_size)
+        old = self.__cell_of.get(key)
+        if old == cell:
+            return False
+
+        if old is not None:
+            self.__leave(key, old)
+
+        self.__cell_of[key] = cell
+        self.__cells.setdefault(cell, set()).add(key)
+        return True
+
+    def remove(self, key: tp.Hashable) -> None:
+        cell = self.__cell_of.pop(key, None)
+        if cell is not None:
+            self.__leave(key, cell)
+
+    def __leave(self, key: tp.Hashable, cell: tuple[int, int]) -> None:
+        members = self.__cells[cell]
+        members.discard(key)
+        if not members:
+            del self.__cells[cell]
+
+    def nearby(self, key: tp.Hashable) -> set[tp.Hashable]:
+        """
+        all keys in the cell of key and the 8 around it (including key itself)
+
+        :returns: an empty set if key isn't in the grid
+        """
+        cell = self.__cell_of.get(key)
+        if cell is None:
+            return set()
+
+        cx, cy = cell
+        found = set()
+        for x in range(cx - 1, cx + 2):
+            for y in range(cy - 1, cy + 2):
+                found.update(self.__cells.get((x, y), ()))
+
+        return found
+
+
+def segment_entry(start: np.ndarray, end: np.ndarray, rects: np.ndarray) -> np.ndarray:
+    """
+    slab test of n line segments against m rectangles
+
+    :param start: array of shape (n, 2)
+    :param end: array of shape (n, 2)
+    :param rects: array of shape (m, 4) with x0, y0, x1, y1 per rectangle,
+        or (n, m, 4) to test every segment against its own rectangles
+    :returns: for every segment the fraction (0 - 1) of its length where it
+        first enters a rectangle, inf if it doesn't hit any
+    """
+    shape = (len(start), rects.shape[-2])
+    if not shape[1]:
+        return np.full(len(start), np.inf)
+
+    direction = end - start
+    t_enter = np.zeros(shape)
+    t_exit = np.ones(shape)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for axis in range(2):
+            origin = start[:, axis, np.newaxis]
+            d = direction[:, axis, np.newaxis]
+            t0 = (rects[..., axis] - origin) / d
+            t1 = (rects[..., axis + 2] - origin) / d
+
+            # parallel to the slab: either always or never inside
+            parallel = d == 0
+            inside = (rects[..., axis] < origin) & (origin < rects[..., axis + 2])
+            t0 = np.where(parallel, np.where(inside, -np.inf, np.inf), t0)
+            t1 = np.where(parallel, np.inf, t1)
+
+            t_enter = np.maximum(t_enter, np.minimum(t0, t1))
+            t_exit = np.minimum(t_exit, np.maximum(t0, t1))
+
+    t_enter[t_enter > t_exit] = np.inf
+    return t_enter.min(axis=1)
+
+
+class PlatformGrid:
+    """
+    static uniform grid over the platforms of a world
+
+    built once when the world is loaded, every cell knows the platforms
+    overlapping it, so point and segment queries only test a few rects
+    instead of all of them
+    """
+    __cell_size: int
+    __rects: np.ndarray
+    __origin: np.ndarray
+    __origin_xy: tuple[float, float]
+    __shape: tuple[int, int]
+    __cells: dict[tuple[int, int], list[tuple[float, float, float, float]]]
+    __table: np.ndarray
+
+    def __init__(self, rects: np.ndarray, cell_size: int = 128) -> None:
+        """
+        :param rects: array of shape (n, 4) with x0, y0, x1, y1 per platform
+        :param cell_size: width and height of a cell
+        """
+        self.__cell_size = cell_size
+        self.__rects = np.asarray(rects, dtype=np.float64).reshape(-1, 4)
+        self.__cells = {}
+
+        if len(self.__rects):
+            self.__origin = self.__rects[:, :2].min(axis=0)
+            extent = self.__rects[:, 2:].max(axis=0) - self.__origin
+            self.__shape = (int(extent[0] // cell_size) + 1, int(extent[1] // cell_size) + 1)
+
+        else:
+            self.__origin = np.zeros(2)
+            self.__shape = (0, 0)
+
+        # plain floats are a lot faster for the scalar queries
+        self.__origin_xy = (float(self.__origin[0]), float(self.__origin[1]))
+
+        # cell -> platforms for scalar queries, cell -> indices for batched ones
+        indices: dict[tuple[int, int], list[int]] = {}
+        for i, rect in enumerate(self.__rects.tolist()):
+            (cx0, cy0), (cx1, cy1) = self.__cell(rect[0], rect[1]), self.__cell(rect[2], rect[3])
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    self.__cells.setdefault((cx, cy), []).append(tuple(rect))
+                    indices.setdefault((cx, cy), []).append(i)
+
+        # padded with the index of an extra rect that is never hit
+        depth = max((len(members) for members in indices.values()), default=0)
+        self.__table = np.full((*self.__shape, depth), len(self.__rects), dtype=np.intp)
+        for (cx, cy), members in indices.items():
+            self.__table[cx, cy, :len(members)] = members
+
+        self.__rects = np.vstack([self.__rects, np.full((1, 4), np.inf)])
+
+    def __len__(self) -> int:
+        return len(self.__rects) - 1
+
+    @property
+    def empty(self) -> bool:
+        return len(self) == 0
+
+    def __cell(self, x: float, y: float) -> tuple[int, int]:
+        ox, oy = self.__origin_xy
+        return int((x - ox) // self.__cell_size), int((y - oy) // self.__cell_size)
+
+    @property
+    def cell_size(self) -> int:
+        return self.__cell_size
+
+    @property
+    def rects(self) -> np.ndarray:
+        """
+        x0, y0, x1, y1 per platform
+        """
+        return self.__rects[:-1]
+
+    def query(self, x0: float, y0: float, x1: float, y1: float) -> list[tuple[float, float, float, float]]:
+        """
+        all platforms in the cells touched by the area (no exact overlap test)
+        """
+        (cx0, cy0), (cx1, cy1) = self.__cell(min(x0, x1), min(y0, y1)), self.__cell(max(x0, x1), max(y0, y1))
+        cx0, cy0 = max(cx0, 0), max(cy0, 0)
+        cx1, cy1 = min(cx1, self.__shape[0] - 1), min(cy1, self.__shape[1] - 1)
+
+        if cx1 - cx0 == 0 and cy1 - cy0 == 0:
+            return self.__cells.get((cx0, cy0), [])
+
+        found: dict[tuple[float, float, float, float], None] = {}
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                found.update(dict.fromkeys(self.__cells.get((cx, cy), ())))
+
+        return list(found)
+
+    def floor_at(self, x: float, y: float) -> float | None:
+        """
+        the top edge of the platform the point is in, None if it isn't in one
+        """
+        for x0, y0, x1, y1 in self.__cells.get(self.__cell(x, y), ()):
+            if x0 < x < x1 and y0 < y < y1:
+                return y0
+
+        return None
+
+    def __candidates(self, points: np.ndarray) -> np.ndarray:
+        """
+        indices of the platforms in the cell of every point, shape (n, depth)
+        """
+        cells = ((points - self.__origin) // self.__cell_size).astype(np.intp)
+        outside = (cells < 0).any(axis=1) | (cells[:, 0] >= self.__shape[0]) | (cells[:, 1] >= self.__shape[1])
+        cells[outside] = 0
+
+        candidates = self.__table[cells[:, 0], cells[:, 1]]
+        candidates[outside] = len(self)
+        return candidates
+
+    def floors_at(self, points: np.ndarray) -> np.ndarray:
+        """
+        batched `floor_at`
+
+        :param points: array of shape (n, 2)
+        :returns: the top edge for every point, nan if it isn't in a platform
+        """
+        if not len(self):
+            return np.full(len(points), np.nan)
+
+        rects = self.__rects[self.__candidates(points)]
+        x = points[:, 0, np.newaxis]
+        y = points[:, 1, np.newaxis]
+        inside = (rects[..., 0] < x) & (x < rects[..., 2]) & (rects[..., 1] < y) & (y < rects[..., 3])
+
+        # the first platform of the cell, like `floor_at`
+        first = inside.argmax(axis=1)
+        floors = rects[np.arange(len(points)), first, 1]
+        floors[~inside.any(axis=1)] = np.nan
+        return floors
+
+    def segment_entry(self, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+        """
+        batched `segment_entry` against the platforms
+
+        segments shorter than a cell can only touch the cells of their two
+        end points and the two corners between them, longer ones are tested
+        against every platform
+        """
+        if not len(self):
+            return np.full(len(start), np.inf)
+
+        # with only a few platforms testing all of them is cheaper than gathering candidates
+        if len(self) <= 4 * self.__table.shape[2]:
+            return segment_entry(start, end, self.rects)
+
+        entry = np.full(len(start), np.inf)
+        short = (np.abs(end - start) <= self.__cell_size).all(axis=1)
+
+        if short.any():
+            s, e = start[short], end[short]
+            candidates = np.concatenate([
+                self.__candidates(s),
+                self.__candidates(e),
+                self.__candidates(np.column_stack([s[:, 0], e[:, 1]])),
+                self.__candidates(np.column_stack([e[:, 0], s[:, 1]])),
+            ], axis=1)
+            entry[short] = segment_entry(s, e, self.__rects[candidates])
+
+        if not short.all():
+            entry[~short] = segment_entry(start[~short], end[~short], self.rects)
+
+        return entry
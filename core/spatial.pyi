@@ -0,0 +1,63 @@
+"""
+Author:
+Nilusink
+"""
+import pygame as pg
+import numpy as np
+import typing as tp
+
+
+class SpatialHash:
+    __cell_size: int
+    __cells: dict[tuple[int, int], list[tp.Any]]
+    def __init__(self, cell_size: int = 128) -> None: ...
+    @property
+    def cell_size(self) -> int: ...
+    def __keys(self, rect: pg.Rect) -> tp.Iterator[tuple[int, int]]: ...
+    def clear(self) -> None: ...
+    def insert(self, item: tp.Any) -> None: ...
+    def rebuild(self, items: tp.Iterable[tp.Any]) -> None: ...
+    def query(self, rect: pg.Rect) -> list[tp.Any]: ...
+    def pairs(self) -> tp.Iterator[tuple[tp.Any, tp.Any]]: ...
+
+
+class InterestGrid:
+    __cell_size: float
+    __cell_of: dict[tp.Hashable, tuple[int, int]]
+    __cells: dict[tuple[int, int], set[tp.Hashable]]
+    def __init__(self, cell_size: float = 1920) -> None: ...
+    def __len__(self) -> int: ...
+    @property
+    def cell_size(self) -> float: ...
+    def cell_of(self, key: tp.Hashable) -> tuple[int, int] | None: ...
+    def move(self, key: tp.Hashable, x: float, y: float) -> bool: ...
+    def remove(self, key: tp.Hashable) -> None: ...
+    def __leave(self, key: tp.Hashable, cell: tuple[int, int]) -> None: ...
+    def nearby(self, key: tp.Hashable) -> set[tp.Hashable]: ...
+
+
+def segment_entry(start: np.ndarray, end: np.ndarray, rects: np.ndarray) -> np.ndarray: ...
+
+
+class PlatformGrid:
+    __cell_size: int
+    __rects: np.ndarray
+    __origin: np.ndarray
+    __origin_xy: tuple[float, float]
+    __shape: tuple[int, int]
+    __cells: dict[tuple[int, int], list[tuple[float, float, float, float]]]
+    __table: np.ndarray
+    def __init__(self, rects: np.ndarray, cell_size: int = 128) -> None: ...
+    def __len__(self) -> int: ...
+    @property
+    def empty(self) -> bool: ...
+    def __cell(self, x: float, y: float) -> tuple[int, int]: ...
+    @property
+    def cell_size(self) -> int: ...
+    @property
+    def rects(self) -> np.ndarray: ...
+    def query(self, x0: float, y0: float, x1: float, y1: float) -> list[tuple[float, float, float, float]]: ...
+    def floor_at(self, x: float, y: float) -> float | None: ...
+    def __candidates(self, points: np.ndarray) -> np.ndarray: ...
+    def floors_at(self, points: np.ndarray) -> np.ndarray: ...
+    def segment_entry(self, start: np.ndarray, end: np.ndarray) -> np.ndarray: ...
@@ -0,0 +1,130 @@
+"""
+Author:
+Nilusink
+
+destructible terrain stored as a pixel occupancy grid
+"""
+import pygame as pg
+import numpy as np
+
+
+class Terrain:
+    """
+    one boolean per pixel, True where the world is solid
+
+    the grid is indexed [x, y] (like pygame.surfarray), a point is in the
+    pixel (floor(x), ceil(y) - 1), so standing exactly on a top edge
+    isn't inside, just like with the platform rects
+    """
+    __solid: np.ndarray
+    __empty: bool
+    max_samples: int = 512
+
+    def __init__(self, size: tuple[int, int], rects: np.ndarray) -> None:
+        """
+        :param size: width and height of the world
+        :param rects: array of shape (n, 4) with x0, y0, x1, y1 per platform
+        """
+        self.__solid = np.zeros(size, dtype=bool)
+
+        for x0, y0, x1, y1 in np.asarray(rects).reshape(-1, 4).round().astype(int).tolist():
+            self.__solid[max(x0, 0):max(x1, 0), max(y0, 0):max(y1, 0)] = True
+
+        self.__empty = not self.__solid.any()
+
+    def __len__(self) -> int:
+        """
+        number of solid pixels
+        """
+        return int(np.count_nonzero(self.__solid))
+
+    @property
+    def empty(self) -> bool:
+        """
+        nothing was solid when it was built (cheap, unlike `len`)
+
+        carving never adds anything, a terrain carved away completely still isn't empty
+        """
+        return self.__empty
+
+    @property
+    def solid(self) -> np.ndarray:
+        return self.__solid
+
+    def __pixel(self, x: float, y: float) -> tuple[int, int] | None:
+        ix, iy = int(np.floor(x)), int(np.ceil(y)) - 1
+        if 0 <= ix < self.__solid.shape[0] and 0 <= iy < self.__solid.shape[1]:
+            return ix, iy
+
+        return None
+
+    def is_solid(self, x: float, y: float) -> bool:
+        pixel = self.__pixel(x, y)
+        return pixel is not None and bool(self.__solid[pixel])
+
+    def floor_at(self, x: float, y: float) -> float | None:
+        """
+        the top edge of the solid area the point is in
+
+        :returns: the y coordinate of the top edge, None if the point isn't solid
+        """
+        pixel = self.__pixel(x, y)
+        if pixel is None or not self.__solid[pixel]:
+            return None
+
+        ix, iy = pixel
+        empty = np.flatnonzero(~self.__solid[ix, :iy])
+        return float(empty[-1] + 1) if len(empty) else 0.
+
+    def segment_entry(self, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+        """
+        sample n line segments about once per pixel of their own length
+
+        :param start: array of shape (n, 2)
+        :param end: array of shape (n, 2)
+        :returns: for every segment the fraction (0 - 1) of its length where it
+            first hits a solid pixel, inf if it doesn't hit any
+        """
+        if not len(start):
+            return np.full(0, np.inf)
+
+        direction = end - start
+        samples = np.minimum(np.ceil(np.abs(direction).max(axis=1)), self.max_samples).astype(np.intp) + 1
+
+        # all samples of all segments in one flat array, segment after segment
+        first = np.cumsum(samples) - samples
+        segment = np.repeat(np.arange(len(start)), samples)
+        t = (np.arange(samples.sum()) - first[segment]) / np.maximum(samples - 1, 1)[segment]
+
+        points = start[segment] + direction[segment] * t[:, np.newaxis]
+        ix = np.floor(points[:, 0]).astype(np.intp)
+        iy = np.ceil(points[:, 1]).astype(np.intp) - 1
+
+        inside = (0 <= ix) & (ix < self.__solid.shape[0]) & (0 <= iy) & (iy < self.__solid.shape[1])
+        hit = np.zeros(inside.shape, dtype=bool)
+        hit[inside] = self.__solid[ix[inside], iy[inside]]
+
+        # t grows along every segment, so its smallest hit is the first one
+        return np.minimum.reduceat(np.where(hit, t, np.inf), first)
+
+    def carve(self, x: float, y: float, radius: float) -> tuple[pg.Rect, np.ndarray] | None:
+        """
+        remove everything in a circle
+
+        :returns: the changed area and a mask (indexed [x, y] inside the area)
+            of the pixels that were removed, None if nothing was solid
+        """
+        width, height = self.__solid.shape
+        x0, x1 = max(int(x - radius), 0), min(int(x + radius) + 1, width)
+        y0, y1 = max(int(y - radius), 0), min(int(y + radius) + 1, height)
+        if x0 >= x1 or y0 >= y1:
+            return None
+
+        xx, yy = np.ogrid[x0:x1, y0:y1]
+        region = self.__solid[x0:x1, y0:y1]
+        removed = region & ((xx + .5 - x) ** 2 + (yy + .5 - y) ** 2 <= radius ** 2)
+        if not removed.any():
+            return None
+
+        region[removed] = False
+        return pg.Rect(x0, y0, x1 - x0, y1 - y0), removed
@@ -0,0 +1,23 @@
+"""
+Author:
+Nilusink
+"""
+import pygame as pg
+import numpy as np
+
+
+class Terrain:
+    __solid: np.ndarray
+    __empty: bool
+    max_samples: int
+    def __init__(self, size: tuple[int, int], rects: np.ndarray) -> None: ...
+    def __len__(self) -> int: ...
+    @property
+    def empty(self) -> bool: ...
+    @property
+    def solid(self) -> np.ndarray: ...
+    def __pixel(self, x: float, y: float) -> tuple[int, int] | None: ...
+    def is_solid(self, x: float, y: float) -> bool: ...
+    def floor_at(self, x: float, y: float) -> float | None: ...
+    def segment_entry(self, start: np.ndarray, end: np.ndarray) -> np.ndarray: ...
+    def carve(self, x: float, y: float, radius: float) -> tuple[pg.Rect, np.ndarray] | None: ...
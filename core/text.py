@@ -0,0 +1,92 @@
+"""
+Author:
+Nilusink
+
+cache for rendered text
+"""
+from collections import OrderedDict
+import core.config as config
+import pygame as pg
+import typing as tp
+
+
+# characters rendered glyph by glyph
+NUMERIC: frozenset[str] = frozenset("0123456789.-")
+
+
+class TextCache:
+    """
+    keeps the most recently rendered strings
+
+    numbers change too often to be cached as a whole,
+    so they are put together from cached glyphs
+    """
+    __surfaces: OrderedDict[tuple[str, tuple, pg.font.Font], pg.Surface]
+    __glyphs: dict[tuple[str, tuple, pg.font.Font], pg.Surface]
+    __max_size: int
+
+    def __init__(self, max_size: int = 256) -> None:
+        self.__surfaces = OrderedDict()
+        self.__glyphs = {}
+        self.__max_size = max_size
+
+    def __len__(self) -> int:
+        return len(self.__surfaces)
+
+    def render(self, font: pg.font.Font, text: str, color: tp.Sequence[float]) -> pg.Surface:
+        """
+        like font.render, but only renders each (text, color, font) once
+        """
+        key = (text, tuple(color), font)
+        surface = self.__surfaces.get(key)
+        if surface is not None:
+            self.__surfaces.move_to_end(key)
+            return surface
+
+        surface = font.render(text, False, color)
+        self.__surfaces[key] = surface
+        if len(self.__surfaces) > self.__max_size:
+            self.__surfaces.popitem(last=False)
+
+        return surface
+
+    def glyph(self, font: pg.font.Font, char: str, color: tp.Sequence[float]) -> pg.Surface:
+        key = (char, tuple(color), font)
+        if key not in self.__glyphs:
+            self.__glyphs[key] = font.render(char, False, color)
+
+        return self.__glyphs[key]
+
+    def blit(
+            self,
+            surface: pg.Surface,
+            font: pg.font.Font,
+            text: str,
+            color: tp.Sequence[float],
+            position: tuple[float, float]
+    ) -> pg.Rect:
+        """
+        draw text onto surface
+
+        :returns: the area that was drawn on
+        """
+        if not text or not NUMERIC.issuperset(text):
+            return surface.blit(self.render(font, text, color), position)
+
+        x, y = position
+        glyphs = []
+        for char in text:
+            glyph = self.glyph(font, char, color)
+            glyphs.append((glyph, (x, y)))
+            x += glyph.get_width()
+
+        rects = surface.blits(glyphs)
+        return rects[0].unionall(rects[1:])
+
+    def clear(self) -> None:
+        self.__surfaces.clear()
+        self.__glyphs.clear()
+
+
+# should be the only instance of the class
+Texts = TextCache(config.const.TEXT_CACHE_SIZE)
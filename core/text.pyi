@@ -0,0 +1,32 @@
+"""
+Author:
+Nilusink
+"""
+from collections import OrderedDict
+import pygame as pg
+import typing as tp
+
+
+NUMERIC: frozenset[str]
+
+
+class TextCache:
+    __surfaces: OrderedDict[tuple[str, tuple, pg.font.Font], pg.Surface]
+    __glyphs: dict[tuple[str, tuple, pg.font.Font], pg.Surface]
+    __max_size: int
+    def __init__(self, max_size: int = 256) -> None: ...
+    def __len__(self) -> int: ...
+    def render(self, font: pg.font.Font, text: str, color: tp.Sequence[float]) -> pg.Surface: ...
+    def glyph(self, font: pg.font.Font, char: str, color: tp.Sequence[float]) -> pg.Surface: ...
+    def blit(
+            self,
+            surface: pg.Surface,
+            font: pg.font.Font,
+            text: str,
+            color: tp.Sequence[float],
+            position: tuple[float, float]
+    ) -> pg.Rect: ...
+    def clear(self) -> None: ...
+
+
+Texts: TextCache
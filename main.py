@@ -44,9 +44,11 @@ def main() -> None:
     )
 
     while True:
+        # server.apply_updates(main_player)
         Game.update()
         # server.send_update(main_player)
-        pg.display.update()
+        # server.flush()
+        Game.update_display()
 
 
 if __name__ == "__main__":
@@ -1,109 +1,562 @@
-from concurrent.futures import ThreadPoolExecutor
-from core.gamesocket import GameSocket
+import os
+
+# the server runs its own simulation, without a window
+os.environ.setdefault("GAME_HEADLESS", "1")
+
+from core.protocol import PROTOCOL_VERSION, LEGACY_VERSION, DELTA_VERSION, HELLO_MAGIC, HELLO_SIZE, START_MARKER, END_MARKER
+from core.protocol import FRAME_HEADER, MAX_FRAME_SIZE, ProtocolError, hello, parse_hello, encode, decode
+from core.snapshots import SnapshotEncoder, SnapshotDecoder, merge
+from core.server_connecter import Connection
+from core.spatial import InterestGrid
+from core.game import Game, Player, Players, Respawning
+from core.new_types import Vec2
+from collections import OrderedDict
+from contextlib import suppress
 from traceback import format_exc
+import core.config as config
+import typing as tp
+import itertools
+import asyncio
+import signal
 import socket
+import json
+import time
+import sys
+
+
+class Client:
+    """
+    a connected client, the server side of a `Connection`
+
+    outgoing packets wait in a queue that is drained by the client's own
+    writer task, so a slow client only delays itself. player updates for
+    the same player are merged while waiting (newest state, all events),
+    updates without events that waited longer than `max_delay` are
+    dropped (the client gets a keyframe of that player next). clients that
+    can't even keep up with the events are disconnected
+
+    the limit is a time and not a number of packets, a whole tick (one
+    update per player) is queued before the writer task gets to run
+    """
+    negotiation_timeout: float = 1
+    max_delay: float = .1
+    max_reliable: int = 1024
+    reader: asyncio.StreamReader
+    writer: asyncio.StreamWriter
+    addr: tuple[str, int]
+    protocol_version: int
+    player_name: str | None
+    snapshots: SnapshotDecoder
+    known: set[str]
+    sent: int
+    coalesced: int
+    dropped: int
+    max_depth: int
+    too_slow: bool
+    __queue: OrderedDict[tp.Hashable, tuple[dict, dict[int, bytes], float]]
+    __ready: asyncio.Event
+    __keys: tp.Iterator[int]
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.addr = writer.get_extra_info("peername")
+        self.protocol_version = LEGACY_VERSION
+        self.player_name = None
+
+        # delta encoding, players the client has the state of
+        self.snapshots = SnapshotDecoder()
+        self.known = set()
+
+        # metrics
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.too_slow = False
+
+        self.__queue = OrderedDict()
+        self.__ready = asyncio.Event()
+        self.__keys = itertools.count()
+
+        # asyncio already does this for tcp, but it matters: packets are batched per tick (see write_packets)
+        sock = writer.get_extra_info("socket")
+        if sock is not None and sock.family in (socket.AF_INET, socket.AF_INET6):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    @property
+    def depth(self) -> int:
+        """
+        number of packets waiting to be sent
+        """
+        return len(self.__queue)
 
+    async def negotiate(self) -> int:
+        """
+        answer the hello of the client
 
-def print_traceback(func):
-    def wrapper(*args, **kwargs):
+        clients that don't send one only speak version 1
+        """
         try:
-            func(*args, **kwargs)
+            first = await asyncio.wait_for(self.reader.readexactly(1), self.negotiation_timeout)
 
-        except Exception:
-            print(f"\nexception in {func}\n")
-            raise
+        except asyncio.TimeoutError:
+            # old clients don't have to send anything right away
+            first = b""
+
+        if first == HELLO_MAGIC[:1]:
+            rest = await asyncio.wait_for(self.reader.readexactly(HELLO_SIZE - 1), self.negotiation_timeout)
+            version = parse_hello(first + rest)
+            if version is None:
+                raise ProtocolError(f"invalid hello: {first + rest}")
+
+            self.protocol_version = min(version, PROTOCOL_VERSION)
+            self.send(hello(self.protocol_version))
+
+        else:
+            # an already read start marker is skipped by recv_packet anyway
+            self.protocol_version = LEGACY_VERSION
+
+        return self.protocol_version
+
+    async def recv_packet(self) -> dict:
+        if self.protocol_version == LEGACY_VERSION:
+            while True:
+                data = await self.reader.readuntil(END_MARKER)
+                msg_body = data[data.rfind(START_MARKER) + 1:-1]
+
+                try:
+                    return json.loads(msg_body)
+
+                except json.decoder.JSONDecodeError:
+                    print(f"Error (json): [{len(msg_body)}]")
+
+        length, kind = FRAME_HEADER.unpack(await self.reader.readexactly(FRAME_HEADER.size))
+        if length > MAX_FRAME_SIZE:
+            raise ProtocolError(f"frame too large: {length} bytes")
+
+        return decode(kind, await self.reader.readexactly(length))
+
+    def send(self, data: bytes) -> None:
+        """
+        write already encoded data right away, skipping the queue
+        """
+        self.writer.write(data)
 
-    return wrapper
+    def send_packet(self, packet: dict, encoded: dict[int, bytes] | None = None) -> None:
+        """
+        queue a packet (never blocks)
 
+        :param encoded: cache of the encoded packet per protocol version,
+            shared between all clients the packet is sent to
+        """
+        if encoded is None:
+            encoded = {}
 
-class Server(GameSocket):
-    running: bool = True
-    default_timeout: float = .2
-    __clients: list[GameSocket]
-    __Pool: ThreadPoolExecutor
+        now = time.monotonic()
+        name = packet.get("name") if "events" in packet else None
+        if name is not None and name in self.__queue:
+            # merge with the waiting update of the same player, its events still have to arrive
+            waiting, _, queued = self.__queue[name]
+            self.__queue[name] = (merge(waiting, packet), {}, queued)
+            self.coalesced += 1
 
-    def __init__(self, port: int) -> None:
-        super().__init__(socket.AF_INET, socket.SOCK_STREAM)
-        self.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self.bind(("0.0.0.0", port))
-        self.listen()
+        else:
+            self.__queue[name if name is not None else next(self.__keys)] = (packet, encoded, now)
+
+        self.__drop_outdated(now)
+
+        self.max_depth = max(self.max_depth, len(self.__queue))
+        self.__ready.set()
+
+    def __drop_outdated(self, now: float) -> None:
+        """
+        drop the updates without events that waited longer than `max_delay`
+        """
+        outdated, late = [], 0
+        for key, (packet, _, queued) in self.__queue.items():
+            if now - queued <= self.max_delay:
+                # everything after it was queued later
+                break
+
+            if packet.get("events", True):
+                late += 1
+
+            else:
+                outdated.append(key)
+
+        for key in outdated:
+            packet, _, _ = self.__queue.pop(key)
+            self.known.discard(packet["name"])
+
+        self.dropped += len(outdated)
+
+        if late > self.max_reliable and not self.too_slow:
+            print(f"Slow client, disconnecting: {self.addr}")
+            self.too_slow = True
+            self.writer.transport.abort()
+
+    async def write_packets(self) -> None:
+        """
+        send the queued packets, waits whenever the connection is backed up
+
+        runs as its own task until the connection is closed. everything
+        queued in the meantime (e.g. all players of a tick) is sent with one write
+        """
+        with suppress(ConnectionError):
+            while True:
+                await self.__ready.wait()
+                self.__ready.clear()
+
+                while self.__queue:
+                    batch = []
+                    while self.__queue:
+                        _, (packet, encoded, _) = self.__queue.popitem(last=False)
+                        if self.protocol_version not in encoded:
+                            encoded[self.protocol_version] = encode(packet, self.protocol_version)
+
+                        batch.append(encoded[self.protocol_version])
+
+                    self.writer.writelines(batch)
+                    self.sent += len(batch)
+
+                    # only waits if the kernel and transport buffers are full
+                    await self.writer.drain()
+
+    async def close(self) -> None:
+        self.writer.close()
+        with suppress(ConnectionError):
+            await self.writer.wait_closed()
+
+
+class Server:
+    """
+    asyncio server, every client has a reader task and the simulation
+    runs as another task on the same loop, so nothing needs locking
+
+    clients only get updates of the players near their own one (see
+    `InterestGrid`), players further away are sent every
+    FAR_UPDATE_INTERVAL updates so they don't disappear. the state of
+    their own player is sent at the same rate (and when its hp changes),
+    so they can correct their prediction
+    """
+    backlog: int = 1024
+    metrics_interval: float = 10
+    __port: int
+    __simulate: bool
+    __clients: list[Client]
+    __totals: dict[str, int]
+    __snapshots: SnapshotEncoder
+    __interest: InterestGrid
+    __far_updates: dict[str, int]
+    __events: dict[str, list[dict]]
+    __has_clients: asyncio.Event
+    __stopped: asyncio.Event
+
+    def __init__(self, port: int, simulate: bool = True) -> None:
+        """
+        :param port: port to listen on, run one server per match
+        :param simulate: run the game on the server and send its state,
+            otherwise the messages of the clients are only relayed
+        """
+        self.__port = port
+        self.__simulate = simulate
 
         # later used variables
         self.__clients = []
-        self.__Pool = ThreadPoolExecutor(max_workers=100)
 
-        # start sending thread
-        self.__msg_pool: list[tuple[dict, GameSocket]] = []
+        # metrics of the clients that already disconnected
+        self.__totals = dict.fromkeys(("sent", "coalesced", "dropped", "too_slow", "max_depth"), 0)
+
+        # events not sent yet per player
+        self.__events = {}
+        self.__snapshots = SnapshotEncoder()
+
+        # area of interest, updates per player since the last far update
+        self.__interest = InterestGrid(config.const.INTEREST_RADIUS)
+        self.__far_updates = {}
 
-        self.__Pool.submit(self.send_all)
+        self.__has_clients = asyncio.Event()
+        self.__stopped = asyncio.Event()
 
     @property
-    def clients(self) -> list[GameSocket]:
+    def clients(self) -> list[Client]:
         return self.__clients
 
     @property
-    def msg_pool(self) -> list[tuple[dict, GameSocket]]:
-        tmp = self.__msg_pool.copy()
-        self.__msg_pool.clear()
-        return tmp
+    def metrics(self) -> dict[str, int]:
+        """
+        outbound queue statistics, counters include disconnected clients
+        """
+        metrics = {
+            "clients": len(self.__clients),
+            "depth": sum(client.depth for client in self.__clients),
+            **self.__totals
+        }
 
-    def accept_clients(self) -> None:
-        self.settimeout(self.default_timeout)
-        while self.running:
-            try:
-                cl, address = self.accept()
-                cl = GameSocket.from_socket(cl)
+        for client in self.__clients:
+            metrics["sent"] += client.sent
+            metrics["coalesced"] += client.coalesced
+            metrics["dropped"] += client.dropped
+            metrics["too_slow"] += client.too_slow
+            metrics["max_depth"] = max(metrics["max_depth"], client.max_depth)
 
-                cl.addr = address
-                print(f"New user: {address}")
+        return metrics
 
-                self.__Pool.submit(self.handle_client, cl)
+    async def run(self) -> None:
+        """
+        serve until `end` is called
+        """
+        server = await asyncio.start_server(
+            self.handle_client,
+            "0.0.0.0",
+            self.__port,
+            backlog=self.backlog,
+            limit=MAX_FRAME_SIZE,
+            reuse_address=True
+        )
+        tasks = [asyncio.create_task(self.report_metrics())]
+        if self.__simulate:
+            tasks.append(asyncio.create_task(self.simulate()))
 
-            except TimeoutError:
-                continue
+        try:
+            await self.__stopped.wait()
 
-            except (Exception,):
-                print(f"Error in thread (accept_clients): {format_exc()}")
+        finally:
+            server.close()
+            for task in tasks:
+                task.cancel()
 
-    def handle_client(self, client: GameSocket) -> None:
-        self.__clients.append(client)
+            # say goodbye to everyone still connected, wait_closed waits for their connections (python >= 3.12.1)
+            await asyncio.gather(*(client.close() for client in self.__clients), return_exceptions=True)
+            await server.wait_closed()
 
-        client.settimeout(self.default_timeout)
-        while self.running:
-            try:
-                msg = client.recv_packet()
-                self.__msg_pool.append((msg, client))
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        client = Client(reader, writer)
+        print(f"New user: {client.addr}")
+        writing = None
 
-            except TimeoutError:
-                continue
+        try:
+            # nothing may be sent before the protocol version is known
+            await client.negotiate()
+            if self.__stopped.is_set():
+                # connected while shutting down, already missed the goodbye
+                return
+
+            writing = asyncio.create_task(client.write_packets())
+            self.__clients.append(client)
+            self.__has_clients.set()
+
+            while True:
+                self.on_packet(await client.recv_packet(), client)
+
+        except (asyncio.IncompleteReadError, ConnectionError):
+            print(f"User disconnected: {client.addr}")
 
-            except (Exception,):
-                print(f"Error in thread(handle_client, {client}): {format_exc()}")
-                client.close()
+        except asyncio.CancelledError:
+            raise
+
+        except (Exception,):
+            print(f"Error in task(handle_client, {client.addr}): {format_exc()}")
+
+        finally:
+            if writing is not None:
+                writing.cancel()
+
+            if client in self.__clients:
                 self.__clients.remove(client)
+                self.__totals["sent"] += client.sent
+                self.__totals["coalesced"] += client.coalesced
+                self.__totals["dropped"] += client.dropped
+                self.__totals["too_slow"] += client.too_slow
+                self.__totals["max_depth"] = max(self.__totals["max_depth"], client.max_depth)
+
+            if not self.__clients:
+                self.__has_clients.clear()
+
+            if client.player_name is not None:
+                self.forget_player(client.player_name)
+
+            await client.close()
+
+    def forget_player(self, name: str) -> None:
+        """
+        remove a player whose client disconnected and everything kept about it
+        """
+        if any(client.player_name == name for client in self.__clients):
+            # reconnected already
+            return
+
+        player = Players.get_by_name(name)
+        if player is not None:
+            player.kill()
+
+        self.__interest.remove(name)
+        self.__far_updates.pop(name, None)
+        self.__snapshots.forget(name)
+        self.__events.pop(name, None)
+
+        for client in self.__clients:
+            client.known.discard(name)
+
+    def on_packet(self, msg: dict, client: Client) -> None:
+        if "name" in msg and "events" in msg:
+            msg = client.snapshots.decode(msg)
+            if msg is None:
                 return
 
-    @print_traceback
-    def send_all(self) -> None:
-        while self.running:
-            tmp = self.msg_pool
+        if self.__simulate:
+            client.player_name = msg["name"]
+            self.apply_update(msg)
+
+        elif "name" in msg and "events" in msg:
+            client.player_name = msg["name"]
+            self.send_player(msg, [other for other in self.__clients if other is not client])
+
+        else:
+            self.broadcast(msg, [other for other in self.__clients if other is not client])
+
+    @staticmethod
+    def broadcast(msg: dict, clients: list[Client]) -> None:
+        """
+        queue a packet for all the clients, encoded only once per protocol version
+        """
+        encoded: dict[int, bytes] = {}
+        for client in clients:
+            client.send_packet(msg, encoded)
+
+    def send_player(self, msg: dict, clients: list[Client]) -> None:
+        """
+        send a player update, clients that know the player only get what changed
+
+        clients far away from the player only get far updates and events
+        """
+        name = msg["name"]
+        self.__interest.move(name, msg["pos"]["x"], msg["pos"]["y"])
+        nearby = self.__interest.nearby(name)
+
+        updates = self.__far_updates.get(name, 0)
+        self.__far_updates[name] = (updates + 1) % config.const.FAR_UPDATE_INTERVAL
+        send_far = updates == 0 or bool(msg["events"])
 
-            for msg, cl in tmp:
-                for client in self.clients:
-                    if client.addr != cl.addr:
-                        client.send_packet(msg)
+        delta = self.__snapshots.encode(msg)
+
+        full, partial, owners = [], [], []
+        for client in clients:
+            if client.player_name == name:
+                # only newer clients know what to do with the state of their own player
+                if client.protocol_version >= DELTA_VERSION and (updates == 0 or (delta is not None and "hp" in delta)):
+                    owners.append(client)
+
+                continue
+
+            if not send_far and client.player_name is not None and client.player_name not in nearby:
+                # the client misses this change, so it needs everything again with the next far update
+                if delta is not None:
+                    client.known.discard(name)
+
+                continue
+
+            if client.protocol_version < DELTA_VERSION or name not in client.known:
+                client.known.add(name)
+                full.append(client)
+
+            else:
+                partial.append(client)
+
+        self.broadcast(msg, full)
+        if delta is not None:
+            self.broadcast(delta, partial)
+
+        # without the events, the owner created them itself
+        self.broadcast({**msg, "events": []}, owners)
+
+    async def simulate(self) -> None:
+        """
+        run the game at the tick rate, the server decides about hits and hp
+        """
+        loop = asyncio.get_running_loop()
+        tick_time = 1 / config.const.TICK_RATE
+        next_tick = loop.time()
+
+        while True:
+            # don't simulate an empty match
+            if not self.__clients:
+                await self.__has_clients.wait()
+                next_tick = loop.time()
+
+            Game.update()
+            self.send_state()
+
+            next_tick += tick_time
+            await asyncio.sleep(max(next_tick - loop.time(), 0))
+
+    def apply_update(self, msg: dict) -> None:
+        """
+        move the player of a client and spawn its bullets in the simulation
+        """
+        player = Players.get_by_name(msg["name"])
+        if player is None:
+            player = Player(spawn_point=Vec2(), name=msg["name"], respawns=True)
+
+        elif player not in Players:
+            # dead, ignored until it respawns
+            return
+
+        # position and shots come from the client, hp only from the simulation
+        Connection.update_player(player, {**msg, "hp": player.hp})
+        self.__events.setdefault(msg["name"], []).extend(msg["events"])
+
+    def send_state(self) -> None:
+        """
+        send every player to all clients that don't control it
+
+        dead players are sent too, so the clients see them die
+        """
+        events, self.__events = self.__events, {}
+
+        for player in Players.sprites() + Respawning.sprites():
+            player: Player
+            msg = {
+                "name": player.name,
+                "hp": player.hp,
+                "pos": {
+                    "x": player.position.x,
+                    "y": player.position.y,
+                },
+                "vel": {
+                    "x": player.velocity.x,
+                    "y": player.velocity.y,
+                },
+                "events": events.get(player.name, [])
+            }
+
+            self.send_player(msg, self.__clients)
+
+    async def report_metrics(self) -> None:
+        """
+        print the queue statistics every `metrics_interval` seconds while clients are connected
+        """
+        while True:
+            await asyncio.sleep(self.metrics_interval)
+            if self.__clients:
+                print(", ".join(f"{key}: {value}" for key, value in self.metrics.items()))
 
     def end(self) -> None:
-        self.running = False
+        self.__stopped.set()
+
 
-    def __del__(self) -> None:
-        self.end()
+async def main(port: int = 12345) -> None:
+    s = Server(port=port)
 
+    # shut down cleanly on ctrl+c / kill
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        with suppress(NotImplementedError):
+            loop.add_signal_handler(sig, s.end)
 
-def main() -> None:
-    s = Server(port=12345)
-    s.accept_clients()
+    await s.run()
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 12345))